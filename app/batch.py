@@ -0,0 +1,189 @@
+"""Classifies every PDF in a folder with a pool of worker processes.
+
+Run from the repository root:
+
+    python app/batch.py uploads --workers 4 --timeout 120 --output app/results/batch_results.xlsx
+
+Each PDF goes through the same `process_pdf` pipeline as an upload. One row
+per document is written to a single CSV or XLSX file (chosen by extension),
+including the documents that failed or timed out, and throughput in
+documents per second is reported at the end.
+"""
+import argparse
+import csv
+import io
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+
+# Batch workers are already separate processes with per-file deadlines, so
+# they parse PDFs themselves instead of through the web app's sandbox pool.
+os.environ.setdefault("SANDBOX_EXTRACTION", "0")
+
+from main import CSV_PATH, process_pdf, warm_up
+from utils.keyword_table import get_keyword_table
+from utils.results_store import RESULT_COLUMNS, result_row
+
+DEFAULT_OUTPUT = "app/results/batch_results.csv"
+
+COLUMNS = [column for column in RESULT_COLUMNS if column != "selected_course"] + ["seconds", "error"]
+
+_verbose = False
+
+
+def init_worker(verbose):
+    """Compiles the keyword table once per worker instead of on its first file,
+    and silences the pipeline's log lines unless `verbose`."""
+    global _verbose
+    _verbose = verbose
+    if not verbose:
+        logging.disable(logging.CRITICAL)  # Failures are reported in the rows
+    with redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        get_keyword_table(CSV_PATH)
+
+
+def classify_file(pdf_path):
+    """Runs `process_pdf` on one file and flattens the result into a row."""
+    start = time.perf_counter()
+    with redirect_stdout(sys.stdout if _verbose else io.StringIO()):
+        result = process_pdf(os.path.basename(pdf_path), upload_folder=os.path.dirname(pdf_path), save_results=False)
+
+    if result[0] is None:
+        raise ValueError("failed to extract text from PDF")
+
+    row = result_row(*result)
+    row.update(file=os.path.basename(pdf_path), seconds=round(time.perf_counter() - start, 3), error="")
+    return row
+
+
+def failed_row(pdf_path, error):
+    row = {column: "" for column in COLUMNS}
+    row.update(file=os.path.basename(pdf_path), error=error)
+    return row
+
+
+def new_pool(workers, verbose):
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(verbose,))
+
+
+def kill_pool(pool):
+    """Stops a pool whose worker is stuck; `shutdown` alone would wait for it."""
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_batch(pdf_paths, workers=None, timeout=120, verbose=False):
+    """Classifies `pdf_paths` and returns one row per file, in input order.
+
+    At most `workers` files are in flight, so a file starts as soon as it is
+    submitted and its deadline is measured from then. A file that overruns
+    its deadline is recorded as timed out and the pool is replaced (a stuck
+    worker cannot be interrupted); the other files that were in flight are
+    resubmitted.
+    """
+    workers = workers or os.cpu_count() or 1
+    rows = {}
+    pending = list(reversed(pdf_paths))
+    running = {}
+    pool = new_pool(workers, verbose)
+
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                path = pending.pop()
+                running[pool.submit(classify_file, path)] = (path, time.monotonic() + timeout)
+
+            next_deadline = min(deadline for _, deadline in running.values())
+            done, _ = wait(running, timeout=max(next_deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                path, _ = running.pop(future)
+                try:
+                    rows[path] = future.result()
+                except BrokenProcessPool:
+                    rows[path] = failed_row(path, "worker process crashed")
+                except Exception as e:
+                    rows[path] = failed_row(path, str(e) or type(e).__name__)
+                if rows[path]["error"]:
+                    print(f"[ERROR] {path}: {rows[path]['error']}")
+
+            now = time.monotonic()
+            expired = [future for future, (_, deadline) in running.items() if deadline <= now]
+            broken = any(isinstance(future.exception(), BrokenProcessPool) for future in done)
+
+            if expired or broken:
+                for future in expired:
+                    path, _ = running.pop(future)
+                    rows[path] = failed_row(path, f"timed out after {timeout}s")
+                    print(f"[ERROR] {path}: timed out after {timeout}s")
+
+                # Requeue the innocent files that were running alongside
+                pending.extend(path for path, _ in running.values())
+                running.clear()
+                kill_pool(pool)
+                pool = new_pool(workers, verbose)
+    finally:
+        if running:
+            kill_pool(pool)  # Interrupted (e.g. Ctrl+C): do not wait on the stragglers
+        else:
+            pool.shutdown()
+
+    return [rows[path] for path in pdf_paths]
+
+
+def write_rows(rows, output_path):
+    """Writes the rows to CSV, or to XLSX when `output_path` ends in .xlsx."""
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    if output_path.endswith(".xlsx"):
+        import pandas as pd
+
+        pd.DataFrame(rows, columns=COLUMNS).to_excel(output_path, index=False, sheet_name="Results")
+    else:
+        with open(output_path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", help="Folder holding the PDFs to classify")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per file")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Consolidated .csv or .xlsx report")
+    parser.add_argument("--verbose", action="store_true", help="Show the per-file pipeline output")
+    args = parser.parse_args()
+
+    pdf_paths = sorted(
+        os.path.join(args.folder, name) for name in os.listdir(args.folder) if name.lower().endswith(".pdf")
+    )
+    if not pdf_paths:
+        print(f"[ERROR] No PDF files found in {args.folder}.")
+        sys.exit(1)
+
+    print(f"🔹 Classifying {len(pdf_paths)} PDF(s) from {args.folder} ...")
+    with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+        warm_up()  # Forked workers inherit the loaded modules and keyword table
+    start = time.perf_counter()
+    rows = run_batch(pdf_paths, workers=args.workers, timeout=args.timeout, verbose=args.verbose)
+    elapsed = time.perf_counter() - start
+
+    write_rows(rows, args.output)
+
+    failures = [row for row in rows if row["error"]]
+    print(f"\n✅ {len(rows) - len(failures)}/{len(rows)} classified in {elapsed:.2f}s "
+          f"({len(rows) / elapsed:.2f} docs/sec), results saved to {args.output}")
+    if failures:
+        print(f"⚠️ {len(failures)} failure(s):")
+        for row in failures:
+            print(f"   {row['file']}: {row['error']}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Grid-searches the scoring weights and thresholds against the ground truth.
+
+Run from the repository root:
+
+    python app/evaluate.py uploads --workers 4 --top 10 --output app/results/grid.csv
+
+Every PDF in the folder with a label in the ground truth CSV is extracted and
+keyword-matched once, and its raw CS/IT keyword sums per section are cached
+in FEATURE_CACHE_DIR (keyed like the classification cache, so editing the
+keyword CSV or the matcher invalidates them). Each configuration of the grid
+is then scored from those sums alone, in chunks across worker processes:
+
+* the title weight and the weight shared by introduction, objectives and
+  scope (25/50 and 25/250 today), and the per-section cap (25),
+* the review cutoff: winning totals below it get "No Alignment" and need a
+  human expert (50 today),
+* the low section scores used for the enhancement suggestions (18 for totals
+  in the Moderate band or above, 20 below it).
+
+Each configuration reports accuracy and macro precision/recall/F1 of the
+CS/IT decision, the share of documents sent to review, the accuracy of the
+rest, and the mean number of sections flagged for enhancement. The current
+configuration is printed first for reference.
+"""
+import argparse
+import csv
+import io
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+# Workers are already separate processes; parse PDFs in them directly
+os.environ.setdefault("SANDBOX_EXTRACTION", "0")
+
+from main import CSV_PATH, GROUND_TRUTH_PATH, MAX_PDF_PAGES, STREAMING_EXTRACTION
+from utils.cache import DiskCache
+from utils.classification_cache import classification_key
+from utils.evaluation import get_ground_truth
+from utils.extraction_cache import cached_extract_text_from_pdf
+from utils.keyword_table import get_keyword_table
+from utils.nlp_processor import classify_text
+from utils.scoring import (
+    ALIGNMENT_CUTOFFS, LOW_SECTION_SCORES, MAX_SECTION_SCORE, SECTION_ORDER, SECTION_WEIGHTS, weighted_totals,
+)
+
+FEATURE_CACHE_DIR = os.environ.get("FEATURE_CACHE_DIR", "app/cache/features")
+
+# Grid axes, in the order configurations are enumerated
+PARAMETERS = ["title_weight", "section_weight", "max_section_score", "review_cutoff", "low_strong", "low_weak"]
+CURRENT = {
+    "title_weight": SECTION_WEIGHTS["title"],
+    "section_weight": SECTION_WEIGHTS["introduction"],
+    "max_section_score": MAX_SECTION_SCORE,
+    "review_cutoff": ALIGNMENT_CUTOFFS[-1],
+    "low_strong": LOW_SECTION_SCORES[0],
+    "low_weak": LOW_SECTION_SCORES[1],
+}
+METRICS = ["accuracy", "precision", "recall", "f1", "review_rate", "accepted_accuracy", "flagged_sections"]
+CHUNK_SIZE = 2048
+
+_features = None
+_labels = None
+
+
+def document_features(pdf_path):
+    """Raw `{section: {"CS": points, "IT": points}}` for one PDF, from the
+    feature cache or by extracting and matching it; None if it has no text."""
+    with redirect_stdout(io.StringIO()):
+        sections = cached_extract_text_from_pdf(pdf_path, streaming=STREAMING_EXTRACTION, max_pages=MAX_PDF_PAGES)
+        if not sections:
+            return None
+        table = get_keyword_table(CSV_PATH)
+        key = classification_key(sections, table)
+        cache = DiskCache(FEATURE_CACHE_DIR)
+        features = cache.get(key)
+        if features is None:
+            section_scores = classify_text(sections, table.matcher, table.fuzzy_matcher)[0]
+            features = {
+                section: {field: section_scores.get(section, {}).get(field, 0) for field in ("CS", "IT")}
+                for section in SECTION_ORDER
+            }
+            cache.put(key, features)
+    return features
+
+
+def init_worker(features, labels):
+    global _features, _labels
+    _features, _labels = features, labels
+
+
+def grid_axes(args):
+    return [getattr(args, parameter) for parameter in PARAMETERS]
+
+
+def score_configs(configs):
+    """Metrics for an array of configurations (one row each, columns in
+    PARAMETERS) over the cached features; returns an array, columns in METRICS."""
+    import numpy as np
+
+    features, actual_cs = _features, _labels
+    count = len(configs)
+    weights = np.empty((count, len(SECTION_ORDER)))
+    for j, section in enumerate(SECTION_ORDER):
+        weights[:, j] = configs[:, 0] if section == "title" else configs[:, 1]
+
+    # (configs, documents, sections, fields), scored exactly as score_corpus does
+    scores, totals = weighted_totals(features[None], weights[:, None, :], configs[:, 2][:, None])
+    predicted_cs = totals[:, :, 0] > totals[:, :, 1]
+    winning = np.where(predicted_cs, totals[:, :, 0], totals[:, :, 1])
+    winning_scores = np.where(predicted_cs[:, :, None], scores[:, :, :, 0], scores[:, :, :, 1])
+
+    correct = predicted_cs == actual_cs[None]
+    precisions, recalls, f1s, present = [], [], [], []
+    for label_cs in (True, False):
+        predicted = (predicted_cs == label_cs).sum(axis=1)
+        actual = (actual_cs == label_cs).sum()
+        true_positives = (correct & (predicted_cs == label_cs)).sum(axis=1)
+        precision = np.divide(true_positives, predicted, out=np.zeros(count), where=predicted > 0)
+        recall = true_positives / actual if actual else np.zeros(count)
+        f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros(count), where=precision + recall > 0)
+        precisions.append(precision)
+        recalls.append(recall)
+        f1s.append(f1)
+        present.append((predicted > 0) | (actual > 0))
+    present = np.array(present)
+    labels = present.sum(axis=0)
+
+    def macro(values):
+        return (np.array(values) * present).sum(axis=0) / labels
+
+    accepted = winning >= configs[:, 3][:, None]
+    accepted_count = accepted.sum(axis=1)
+    low = np.where(winning >= ALIGNMENT_CUTOFFS[2], configs[:, 4][:, None], configs[:, 5][:, None])
+
+    return np.column_stack([
+        correct.mean(axis=1),
+        macro(precisions),
+        macro(recalls),
+        macro(f1s),
+        1 - accepted_count / correct.shape[1],
+        np.divide((correct & accepted).sum(axis=1), accepted_count, out=np.zeros(count), where=accepted_count > 0),
+        (winning_scores < low[:, :, None]).sum(axis=2).mean(axis=1),
+    ])
+
+
+def score_chunk(chunk):
+    import numpy as np
+
+    return score_configs(np.array(chunk, dtype=np.float64))
+
+
+def format_row(values):
+    config = " ".join(f"{values[parameter]:>8g}" for parameter in PARAMETERS)
+    metrics = " ".join(f"{values[metric]:>8.4f}" for metric in METRICS)
+    return f"{config} {metrics}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", help="Folder holding the labeled PDFs")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--title-weight", type=float, nargs="+", default=[0.3, 0.4, 0.5, 0.6, 0.7, 0.8])
+    parser.add_argument("--section-weight", type=float, nargs="+", default=[0.05, 0.075, 0.1, 0.125, 0.15, 0.2])
+    parser.add_argument("--max-section-score", type=float, nargs="+", default=[15, 20, 25, 30, 35])
+    parser.add_argument("--review-cutoff", type=float, nargs="+", default=[30, 40, 50, 60])
+    parser.add_argument("--low-strong", type=float, nargs="+", default=[14, 16, 18, 20])
+    parser.add_argument("--low-weak", type=float, nargs="+", default=[16, 18, 20, 22])
+    parser.add_argument("--top", type=int, default=10, help="Configurations to print, best first")
+    parser.add_argument("--output", help="Write every configuration's metrics to this CSV")
+    args = parser.parse_args()
+
+    import numpy as np
+
+    ground_truth = get_ground_truth(GROUND_TRUTH_PATH)
+    names = sorted(
+        name for name in os.listdir(args.folder)
+        if name.lower().endswith(".pdf") and ground_truth.label_for(name) is not None
+    )
+    if not names:
+        print(f"[ERROR] No PDFs in {args.folder} have a ground truth label.")
+        sys.exit(1)
+
+    print(f"🔹 Loading features for {len(names)} labeled PDF(s) from {args.folder} ...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(document_features, [os.path.join(args.folder, name) for name in names]))
+    documents = [(name, features) for name, features in zip(names, results) if features is not None]
+    for name, features in zip(names, results):
+        if features is None:
+            print(f"[WARNING] Skipping {name}: no text could be extracted.")
+    print(f"   {len(documents)} document(s) in {time.perf_counter() - start:.2f}s")
+
+    features = np.array(
+        [[[doc[section][field] for field in ("CS", "IT")] for section in SECTION_ORDER] for _, doc in documents],
+        dtype=np.float64,
+    )
+    labels = np.array([ground_truth.label_for(name) == "CS" for name, _ in documents])
+
+    axes = grid_axes(args)
+    configs = list(itertools.product(*axes))
+    chunks = [configs[i:i + CHUNK_SIZE] for i in range(0, len(configs), CHUNK_SIZE)]
+
+    print(f"🔹 Scoring {len(configs)} configuration(s) ...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(features, labels)) as pool:
+        metrics = np.vstack(list(pool.map(score_chunk, chunks)))
+    elapsed = time.perf_counter() - start
+    print(f"   {len(configs)} configuration(s) in {elapsed:.2f}s ({len(configs) / elapsed:,.0f}/sec)")
+
+    rows = [dict(zip(PARAMETERS, config), **dict(zip(METRICS, map(float, values))))
+            for config, values in zip(configs, metrics)]
+    init_worker(features, labels)
+    current = dict(CURRENT, **dict(zip(METRICS, map(float, score_chunk([[CURRENT[p] for p in PARAMETERS]])[0]))))
+
+    header = " ".join(f"{name[:8]:>8}" for name in PARAMETERS + METRICS)
+    print(f"\n{header}")
+    print(f"{format_row(current)}   (current)")
+    rows.sort(key=lambda row: (-row["f1"], -row["accuracy"], -row["accepted_accuracy"], row["review_rate"]))
+    for row in rows[:args.top]:
+        print(format_row(row))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=PARAMETERS + METRICS)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\n✅ {len(rows)} configuration(s) saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
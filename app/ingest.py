@@ -0,0 +1,138 @@
+"""Watches a folder and classifies the PDFs dropped into it.
+
+Run from the repository root:
+
+    python app/ingest.py /srv/proposals --workers 4 --timeout 120
+
+On start, and whenever PDFs are written or moved into the folder (seen via
+inotify, or by polling where inotify is unavailable), the new or changed
+files are classified on a bounded pool of worker processes, the same way
+app/batch.py does, and the results appended to the results store. Every file
+handled is recorded in a manifest (path, size, mtime and content hash) kept
+in the results database, so a restart only picks up what changed while the
+daemon was down. Files that failed (including those whose results could not
+be saved) are not retried until they change, unless `--retry-failed` is given. `--once` processes the backlog and exits.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+from batch import run_batch
+from main import warm_up
+from utils.extraction_cache import content_digest
+from utils.folder_watcher import open_watcher, scan_pdfs
+from utils.ingest_manifest import IngestManifest
+from utils.results_store import get_results_store
+
+# Longest wait for a change before the daemon checks in again
+IDLE_TIMEOUT = 60
+
+
+def changed_files(paths, manifest, retry_failed=False):
+    """The paths (with size, mtime and SHA-256) that need classifying: not in
+    the manifest, or with a different content hash than when last processed."""
+    changed = []
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue  # Removed or renamed since the event
+        entry = manifest.get(path)
+        retry = retry_failed and entry is not None and entry["status"] == "failed"
+        if entry is not None and not retry and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            continue
+
+        try:
+            digest = content_digest(path)
+        except OSError as e:
+            print(f"[ERROR] Failed to read {path}: {e}")
+            continue
+        if entry is not None and not retry and entry["sha256"] == digest:
+            manifest.touch(path, stat.st_size, stat.st_mtime_ns)  # Touched or re-copied, same content
+            continue
+        changed.append((path, stat.st_size, stat.st_mtime_ns, digest))
+    return changed
+
+
+def ingest(paths, manifest, workers, timeout, verbose=False, retry_failed=False):
+    """Classifies the new or changed files among `paths`; returns how many
+    were classified and how many failed."""
+    changed = changed_files(paths, manifest, retry_failed)
+    if not changed:
+        return 0, 0
+
+    print(f"🔹 Classifying {len(changed)} new or changed PDF(s) ...")
+    start = time.perf_counter()
+    rows = run_batch([path for path, _, _, _ in changed], workers=workers, timeout=timeout, verbose=verbose)
+    store = get_results_store()
+    failed = 0
+    for (path, size, mtime_ns, digest), row in zip(changed, rows):
+        if row["error"]:
+            failed += 1
+            manifest.record(path, size, mtime_ns, digest, "failed", error=row["error"])
+            continue
+        try:
+            result_id = store.append(dict(row, selected_course=None))
+        except Exception as e:
+            # An unchanged file raises no new event, so it would not come back
+            # on its own; recorded as failed, --retry-failed picks it up.
+            print(f"[ERROR] Failed to save results for {path}: {e}")
+            failed += 1
+            manifest.record(path, size, mtime_ns, digest, "failed", error=f"saving the results failed: {e}")
+            continue
+        manifest.record(path, size, mtime_ns, digest, "done", result_id=result_id)
+        print(f"   {row['decision']}  {os.path.basename(path)}")
+
+    print(f"✅ {len(changed) - failed}/{len(changed)} classified in {time.perf_counter() - start:.2f}s")
+    return len(changed) - failed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", help="Folder to watch for PDFs")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per file")
+    parser.add_argument("--once", action="store_true", help="Process the current backlog and exit")
+    parser.add_argument("--poll", action="store_true", help="Poll the folder instead of using inotify")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between polls")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry files that failed before")
+    parser.add_argument("--verbose", action="store_true", help="Show the per-file pipeline output")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"[ERROR] {args.folder} is not a folder.")
+        sys.exit(1)
+    folder = os.path.abspath(args.folder)
+
+    with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+        warm_up()  # Forked workers inherit the loaded modules and keyword table
+    manifest = IngestManifest()
+    options = dict(workers=args.workers, timeout=args.timeout, verbose=args.verbose)
+
+    # Watch before the first scan so nothing written meanwhile is missed
+    watcher = None if args.once else open_watcher(folder, args.poll_interval, polling=args.poll)
+    try:
+        print(f"🔹 Checking {folder} against the manifest ...")
+        ingest(scan_pdfs(folder), manifest, retry_failed=args.retry_failed, **options)
+        if watcher is None:
+            return
+
+        print(f"👀 Watching {folder} (Ctrl+C to stop)")
+        while True:
+            paths = watcher.changes(IDLE_TIMEOUT)
+            if paths is None:
+                print("[WARNING] Missed some file events, rescanning the folder.")
+                paths = scan_pdfs(folder)
+            ingest(paths, manifest, **options)
+    except KeyboardInterrupt:
+        print("\n🔹 Stopped.")
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,102 +1,146 @@
+import copy
+import io
+import json
+import logging
 import os
-import pandas as pd
-from flask import Flask, render_template, request
-from utils.pdf_analyzer import extract_text_from_pdf
-from utils.nlp_processor import classify_text
-from utils.csv_loader import load_keywords
-from tabulate import tabulate
-from sklearn.metrics import precision_score, recall_score, f1_score  # 
-from collections import Counter  
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, Response, jsonify, make_response, redirect, render_template, request, send_file, url_for
+from werkzeug.exceptions import RequestEntityTooLarge
+from utils.evaluation import get_confusion_matrix, get_ground_truth
+from utils.classification_cache import classification_cache_stats, classification_key, get_classification_cache
+from utils.extraction_cache import cached_extract_text_from_pdf, content_digest, extraction_cache_stats
+from utils.extraction_pool import ExtractionError, ExtractionPool
+from utils.job_queue import JobQueue, QueueFull
+from utils.pdf_analyzer import extract_text_from_pdf, extract_title_from_pdf
+from utils.results_store import get_results_store, result_row
+from utils.scoring import ALIGNMENT_CUTOFFS, LOW_SECTION_SCORES, decide, weighted_scores
+from utils.similarity_index import get_similarity_index, signature_of
+from utils.uploads import UPLOAD_SPOOL_BYTES, Upload, release_upload
+from utils.nlp_processor import classify_text, get_word_tokenizer
+from utils.keyword_table import get_keyword_table
+from utils.metrics import DOCUMENTS, observe_stage, render_metrics, timed
 import time
-from flask import render_template
 
 
 
 
 UPLOAD_FOLDER = "uploads/"
-RESULTS_PATH = "app/results/classification_results.xlsx"
 CSV_PATH = "dataset/keywords2.csv"
 GROUND_TRUTH_PATH = "dataset/ground_truth.csv"  # ✅ Ensure labeled dataset is available
 
+# Stop reading pages once every section has been closed by a terminating
+# heading; MAX_PDF_PAGES (0 = no cap) bounds the pages read from one upload.
+STREAMING_EXTRACTION = os.environ.get("STREAMING_EXTRACTION", "1") != "0"
+MAX_PDF_PAGES = int(os.environ.get("MAX_PDF_PAGES", "0")) or None
+
+# Uploads are classified on a bounded background pool and the browser polls
+# for the result; ASYNC_UPLOADS=0 classifies inside the request as before.
+ASYNC_UPLOADS = os.environ.get("ASYNC_UPLOADS", "1") != "0"
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "16"))
+
+# /api/classify: worker threads shared by all API requests, and files per request
+API_WORKERS = int(os.environ.get("API_WORKERS", str(JOB_WORKERS)))
+API_MAX_FILES = int(os.environ.get("API_MAX_FILES", "100"))
+# Files queued or being classified across all API requests; a request that
+# would exceed it is rejected with 503 rather than queued without bound.
+API_QUEUE_SIZE = int(os.environ.get("API_QUEUE_SIZE", str(2 * API_MAX_FILES)))
+# Bytes of one API request's files held in memory at once; the rest are
+# spooled to temporary files until their turn comes.
+API_MEMORY_BYTES = int(os.environ.get("API_MEMORY_BYTES", 32 * 1024 * 1024))
+
+# Largest request body accepted (all files together); bigger ones get a 413
+MAX_REQUEST_BYTES = int(os.environ.get("MAX_REQUEST_BYTES", 256 * 1024 * 1024))
+
+# PDFs are parsed in pre-forked worker processes, each document under a
+# wall-clock timeout and an RSS cap; SANDBOX_EXTRACTION=0 (or a platform
+# without fork) parses in-process.
+SANDBOX_EXTRACTION = os.environ.get("SANDBOX_EXTRACTION", "1") != "0" and hasattr(os, "fork")
+EXTRACTION_WORKERS = int(os.environ.get("EXTRACTION_WORKERS", str(JOB_WORKERS + API_WORKERS)))
+EXTRACTION_TIMEOUT = float(os.environ.get("EXTRACTION_TIMEOUT", "60"))
+EXTRACTION_MAX_RSS_MB = int(os.environ.get("EXTRACTION_MAX_RSS_MB", "512"))
+
+# Every classified upload is looked up in, then added to, the MinHash/LSH
+# index of earlier proposals; SIMILARITY_INDEX=0 turns the lookup off.
+SIMILARITY_INDEX = os.environ.get("SIMILARITY_INDEX", "1") != "0"
+
+# LOG_LEVEL=DEBUG prints the extracted sections and per-keyword score tables
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+logger = logging.getLogger(__name__)
+
 # Ensure required directories exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
 
 app = Flask(__name__)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES
+
+job_queue = JobQueue(workers=JOB_WORKERS, max_pending=JOB_QUEUE_SIZE)
+api_executor = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix="api")
+api_in_flight = 0
+api_lock = threading.Lock()
+extraction_pool = ExtractionPool(
+    workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT, max_rss_mb=EXTRACTION_MAX_RSS_MB
+) if SANDBOX_EXTRACTION else None
 
 def normalize_text(text):
     """Lowercases and removes unnecessary characters for better matching."""
     return text.lower().replace("-", " ").strip()
 
-def load_ground_truth():
-    """Loads the ground truth labels from CSV."""
-    if os.path.exists(GROUND_TRUTH_PATH):
-        return pd.read_csv(GROUND_TRUTH_PATH)
-    else:
-        print("[WARNING] Ground truth file not found. Evaluation metrics will not be computed.")
-        return None
-
-def compute_evaluation_metrics(predicted_labels, actual_labels):
-    """Computes Precision, Recall, and F1-score."""
-    print(f"Predicted Labels: {predicted_labels}")
-    print(f"Actual Labels: {actual_labels}")
-
-    precision = precision_score(actual_labels, predicted_labels, average="macro", zero_division=0)
-    recall = recall_score(actual_labels, predicted_labels, average="macro", zero_division=0)
-    f1 = f1_score(actual_labels, predicted_labels, average="macro", zero_division=0)
-
-    print("\n📊 Evaluation Metrics:")
-    print(f"🔹 Precision: {precision:.4f}")
-    print(f"🔹 Recall: {recall:.4f}")
-    print(f"🔹 F1-Score: {f1:.4f}")
-
-    if len(set(actual_labels)) < 2:
-        print("⚠️ Training Only: Only one class detected in actual labels[ground_truth].")
-
-def process_pdf(filename):
-    """Extracts, classifies, and saves the results from a PDF file."""
-    pdf_path = os.path.join(UPLOAD_FOLDER, filename)
-    
-    # Step 1: Extract text from PDF
-    extracted_text = extract_text_from_pdf(pdf_path)
-    
-    if not extracted_text:
-        print("[ERROR] Failed to extract text from PDF.")
-        return None, None, None, None, None  # Return None for Title as well
-
-    title_text = extracted_text.get("title", "Title Not Found")  # Extract Title
-    print("\n🔹 Extracted Title from PDF:\n", title_text)
-
-    sections = {
-        "Title": extracted_text.get("title", ""),
-        "Introduction": extracted_text.get("introduction", ""),
-        "Objectives": extracted_text.get("objectives", ""),
-        "Scope and Limitations": extracted_text.get("scope", ""),
-    }
-    
-    for section_name, content in sections.items():
-        print(f"\n🔹 {section_name}:\n{content}\n" + "-" * 50)
-
-    # Step 2: Load keywords and classify text
-    keywords = load_keywords(CSV_PATH)
-    
-
-    # 🔹 Normalize keywords for better matching
-    normalized_keywords = {
-        "CS": {normalize_text(k): v for k, v in keywords["CS"].items()},
-        "IT": {normalize_text(k): v for k, v in keywords["IT"].items()},
-    }
-
-    section_scores, cs_total_raw, it_total_raw, extracted_keywords = classify_text(extracted_text, normalized_keywords)
-
-  # First determine the dominant field
+def warm_up(start_extraction_pool=True):
+    """Loads the lazily imported dependencies and the keyword table up front.
+
+    Startup stays fast because nothing heavy is imported at module level; a
+    parent that forks workers (batch pool, preforking server) calls this first
+    so every child inherits the loaded modules instead of importing them again.
+    A preforking server passes `start_extraction_pool=False` and starts the
+    pool in each worker, since workers must not share one pool's pipes.
+    """
+    import fitz  # noqa: F401
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+
+    get_word_tokenizer()("Warm up.")  # Also builds what punkt compiles on first use
+    get_keyword_table(CSV_PATH)
+    get_ground_truth(GROUND_TRUTH_PATH)
+    if extraction_pool is not None and start_extraction_pool:
+        extraction_pool.start()
+
+def sandboxed(function, *args, **kwargs):
+    """Runs a PDF parsing function in the extraction pool, or in-process when
+    sandboxing is off. Raises ExtractionError when a worker limit is hit."""
+    if extraction_pool is None:
+        return function(*args, **kwargs)
+    return extraction_pool.call(function, *args, **kwargs)
+
+def extract_sandboxed(pdf_path, **options):
+    return sandboxed(extract_text_from_pdf, pdf_path, **options)
+
+def record_evaluation(document, predicted_label, actual_label):
+    """Stores the latest prediction for a labeled document in the running
+    confusion matrix and logs the corpus-level macro Precision, Recall, and
+    F1-score so far."""
+    logger.debug(f"Predicted Label: {predicted_label}, Actual Label: {actual_label}")
+
+    matrix = get_confusion_matrix()
+    matrix.record(document, actual_label, predicted_label)
+    metrics = matrix.metrics()
+
+    logger.info(
+        f"📊 Evaluation Metrics ({metrics['samples']} labeled documents): "
+        f"Precision {metrics['precision']:.4f}, Recall {metrics['recall']:.4f}, F1-Score {metrics['f1']:.4f}"
+        + (" (training only: one class in the ground truth so far)" if len(metrics["labels"]) < 2 else "")
+    )
 
+def log_keyword_tables(extracted_keywords, normalized_keywords):
+    """Logs the matched keywords and their weights per section (DEBUG level only)."""
+    from tabulate import tabulate
 
     # 🔹 DEBUG PRINT - Check matched keywords per section
     for section in ["title", "introduction", "objectives", "scope"]:
         section_label = section.replace("_", " ").title()
-        print(f"\n🔹 [INFO] Matched Keywords for {section_label.upper()}:\n")
+        logger.debug(f"\n🔹 [INFO] Matched Keywords for {section_label.upper()}:\n")
 
         table_data = []
         unique_words = set(normalize_text(word) for word in extracted_keywords.get(section, []))  # Ensure unique keyword counting
@@ -121,32 +165,33 @@ def process_pdf(filename):
         table_data.append(["SUBTOTAL", cs_subtotal, it_subtotal])
         table_data.append(["OVERALL SUBTOTAL", f"{final_cs_score:.2f}", f"{final_it_score:.2f}"])
 
-        print(tabulate(table_data, headers=["Keyword", "Computer Science", "Information Technology"], tablefmt="grid"))
+        logger.debug(tabulate(table_data, headers=["Keyword", "Computer Science", "Information Technology"], tablefmt="grid"))
+
+def classify_document(extracted_text, keyword_table):
+    """Scores extracted sections against a keyword table: matching, weighting,
+    the strict keyword filter and the interpretation. Depends only on the
+    section texts and the table, so the result can be memoized (see
+    `utils.classification_cache`)."""
+    normalized_keywords = keyword_table.keywords
+
+    section_scores, cs_total_raw, it_total_raw, extracted_keywords = classify_text(
+        extracted_text, keyword_table.matcher, keyword_table.fuzzy_matcher
+    )
+
+  # First determine the dominant field
+
 
     # Step 3: Compute weighted scores using new formula (with normalization)
-    def normalize_score(score):
-        """Ensure the maximum score does not exceed 25."""
-        return min(score, 25)
-
-    cs_scores = {
-        "title": normalize_score(section_scores.get("title", {}).get("CS", 0) * (25 / 50)),
-        "introduction": normalize_score(section_scores.get("introduction", {}).get("CS", 0) * (25 / 250)),
-        "objectives": normalize_score(section_scores.get("objectives", {}).get("CS", 0) * (25 / 250)),
-        "scope": normalize_score(section_scores.get("scope", {}).get("CS", 0) * (25 / 250)),
-    }
+    scoring_start = time.perf_counter()
 
-    it_scores = {
-        "title": normalize_score(section_scores.get("title", {}).get("IT", 0) * (25 / 50)),
-        "introduction": normalize_score(section_scores.get("introduction", {}).get("IT", 0) * (25 / 250)),
-        "objectives": normalize_score(section_scores.get("objectives", {}).get("IT", 0) * (25 / 250)),
-        "scope": normalize_score(section_scores.get("scope", {}).get("IT", 0) * (25 / 250)),
-    }
+    cs_scores = weighted_scores(section_scores, "CS")
+    it_scores = weighted_scores(section_scores, "IT")
 
     # Sum weighted scores
     cs_total_weighted = sum(cs_scores.values())
     it_total_weighted = sum(it_scores.values())
 
-    final_decision = "CS" if cs_total_weighted > it_total_weighted else "IT"
+    final_decision = decide(cs_total_weighted, it_total_weighted)
 
     # STRICT KEYWORD FILTERING
     strictly_filtered = {}
@@ -234,37 +279,38 @@ def process_pdf(filename):
 
 
         # Step 4.1: Identify dominant field and enhancement sections
-    final_decision = "CS" if cs_total_weighted > it_total_weighted else "IT"
+    final_decision = decide(cs_total_weighted, it_total_weighted)
     final_total = cs_total_weighted if final_decision == "CS" else it_total_weighted
     final_scores = cs_scores if final_decision == "CS" else it_scores
 
     # Interpretation and enhancement logic
    # Calculate which sections scored low (below thresholds)
-    low_threshold = 18 if final_total >= 70 else 20
+    full_cutoff, strong_cutoff, moderate_cutoff, basic_cutoff, minimal_cutoff = ALIGNMENT_CUTOFFS
+    low_threshold = LOW_SECTION_SCORES[0] if final_total >= moderate_cutoff else LOW_SECTION_SCORES[1]
     enhancement_needed = [k.title() for k, v in final_scores.items() if v < low_threshold]
     all_sections = ['Title', 'Introduction', 'Objectives', 'Scope']
     is_all_sections_weak = len(enhancement_needed) == len(all_sections)
 
     # Interpretation and enhancement suggestion
-    if final_total >= 90:
+    if final_total >= full_cutoff:
         interpretation = f"{final_total:.2f}% - Full Alignment (Strong foundation of keywords used)"
         enhancement_suggestion = "None, the use of keywords is strong in this study"
 
-    elif final_total >= 80:
+    elif final_total >= strong_cutoff:
         interpretation = f"{final_total:.2f}% - Strong Alignment (Minor enhancements suggested)"
         enhancement_suggestion = (
             f"Minor change in the following sections: {', '.join(enhancement_needed)}"
             if enhancement_needed else "None, the use of keywords is strong in this study"
         )
 
-    elif final_total >= 70:
+    elif final_total >= moderate_cutoff:
         interpretation = f"{final_total:.2f}% - Moderate Alignment (Enhancement needed in key sections)"
         enhancement_suggestion = (
             f"Enhancement needed in the following sections: {', '.join(enhancement_needed)}"
             if enhancement_needed else "None, the use of keywords is fairly solid"
         )
 
-    elif final_total >= 60:
+    elif final_total >= basic_cutoff:
         interpretation = f"{final_total:.2f}% - Basic Alignment (Consider keyword coherence)"
         enhancement_suggestion = (
             "All sections require better keyword relevance"
@@ -272,7 +318,7 @@ def process_pdf(filename):
             f"Needs a strong foundation in the following sections: {', '.join(enhancement_needed)}"
         )
 
-    elif final_total >= 50:
+    elif final_total >= minimal_cutoff:
         interpretation = f"{final_total:.2f}% - Minimal Alignment (Low relevance, improve structure)"
         enhancement_suggestion = (
             "All sections are weak and need improvement"
@@ -284,29 +330,124 @@ def process_pdf(filename):
         interpretation = f"{final_total:.2f}% - No Alignment"
         enhancement_suggestion = "Needs a human expert for validation, It has a weak sections."
 
-    # **Evaluation Step: Compare with ground truth**
-    # Load the ground truth data
-    ground_truth = load_ground_truth()
-    if ground_truth is not None:
-        # Normalize file title
-        clean_filename = normalize_text(os.path.splitext(filename)[0])
-        ground_truth["title_normalized"] = ground_truth["title"].apply(normalize_text)
-
-        # Match title
-        match = ground_truth[ground_truth["title_normalized"] == clean_filename]
-
-        if not match.empty:
-            actual_label = match.iloc[0]["field"]  # Extract the label safely
-            predicted_label = "CS" if cs_total_weighted > it_total_weighted else "IT"
-            compute_evaluation_metrics([predicted_label], [actual_label])
-        else:
-            print(f"[WARNING] No ground truth label found for file: {filename}")
+    observe_stage("scoring", time.perf_counter() - scoring_start)
+
+    return {
+        "cs_scores": cs_scores,
+        "it_scores": it_scores,
+        "cs_total": cs_total_weighted,
+        "it_total": it_total_weighted,
+        "decision": final_decision,
+        "general_keywords": general_keywords,
+        "interpretation": interpretation,
+        "enhancement_suggestion": enhancement_suggestion,
+        "extracted_keywords": extracted_keywords,
+    }
 
+def extract_sections(pdf_path):
+    """Step 1 of `process_pdf`: the PDF's sections, `{}` if no text could be
+    extracted. Re-uploads of the same bytes skip parsing."""
+    try:
+        with timed("extraction"):
+            extracted_text = cached_extract_text_from_pdf(
+                pdf_path, streaming=STREAMING_EXTRACTION, max_pages=MAX_PDF_PAGES, extract=extract_sandboxed
+            )
+    except ExtractionError as e:
+        logger.error(f"[ERROR] Failed to extract text from PDF: {e}")
+        DOCUMENTS.inc(result="failed")
+        raise
+    return extracted_text or {}
+
+def process_pdf(filename, upload_folder=UPLOAD_FOLDER, save_results=True, selected_course=None, source=None,
+                extracted_text=None):
+    """Extracts, classifies, and saves the results from a PDF file.
+
+    `save_results=False` skips the results store and the running evaluation,
+    for callers (such as the batch CLI) that collect the results themselves. `source` is the PDF's bytes
+    (or a temp file path) for uploads processed without saving them under
+    `upload_folder`; `filename` is then only used as the document's name.
+    `extracted_text` is the result of `extract_sections`, for callers that
+    need the sections too (e.g. for `find_similar`) and extracted them first.
+    Raises ExtractionError if parsing the PDF hits a sandbox limit.
+    """
+    pdf_path = source if source is not None else os.path.join(upload_folder, filename)
+    
+    # Step 1: Extract text from PDF
+    if extracted_text is None:
+        extracted_text = extract_sections(pdf_path)
+    
+    if not extracted_text:
+        logger.error("[ERROR] Failed to extract text from PDF.")
+        DOCUMENTS.inc(result="failed")
+        return (None,) * 9  # Same arity as a successful result, with None for Title as well
 
-    # Step 5: Save results to Excel
-    save_results_to_excel(cs_scores, it_scores, cs_total_weighted, it_total_weighted)
+    title_text = extracted_text.get("title", "Title Not Found")  # Extract Title
+    logger.info(f"\n🔹 Extracted Title from PDF:\n {title_text}")
+
+    sections = {
+        "Title": extracted_text.get("title", ""),
+        "Introduction": extracted_text.get("introduction", ""),
+        "Objectives": extracted_text.get("objectives", ""),
+        "Scope and Limitations": extracted_text.get("scope", ""),
+    }
+    
+    for section_name, content in sections.items():
+        logger.debug(f"\n🔹 {section_name}:\n{content}\n" + "-" * 50)
+
+    # Step 2: Load keywords and classify text
+    # The table is parsed, normalized and compiled once per process and only
+    # reloaded when the CSV changes on disk.
+    with timed("keyword_load"):
+        keyword_table = get_keyword_table(CSV_PATH)
+
+    # Steps 2-4 are memoized by section text and keyword table version, so a
+    # re-upload or a re-run on unchanged text skips matching and scoring.
+    key = classification_key(extracted_text, keyword_table)
+    cache = get_classification_cache()
+    classification = cache.get(key)
+    if classification is None:
+        classification = classify_document(extracted_text, keyword_table)
+        cache.put(key, classification)
+    classification = copy.deepcopy(classification)  # Callers may modify their copy
+
+    cs_scores = classification["cs_scores"]
+    it_scores = classification["it_scores"]
+    cs_total_weighted = classification["cs_total"]
+    it_total_weighted = classification["it_total"]
+    final_decision = classification["decision"]
+    general_keywords = classification["general_keywords"]
+    interpretation = classification["interpretation"]
+    enhancement_suggestion = classification["enhancement_suggestion"]
+    extracted_keywords = classification["extracted_keywords"]
+
+    if logger.isEnabledFor(logging.DEBUG):
+        log_keyword_tables(extracted_keywords, keyword_table.keywords)
+
+    # **Evaluation Step: Compare with ground truth**
+    # Labels are indexed by normalized title and reloaded only when the CSV
+    # changes; saved results also update the running confusion matrix.
+    ground_truth = get_ground_truth(GROUND_TRUTH_PATH)
+    if ground_truth:
+        actual_label = ground_truth.label_for(filename)
+        if actual_label is None:
+            logger.warning(f"[WARNING] No ground truth label found for file: {filename}")
+        elif save_results:
+            try:
+                record_evaluation(ground_truth.key_for(filename), final_decision, actual_label)
+            except Exception as e:
+                logger.error(f"[ERROR] Failed to record evaluation: {e}")
+
+
+    # Step 5: Append the result to the results store
+    if save_results:
+        with timed("persistence"):
+            save_result(filename, selected_course, (
+                title_text, cs_scores, it_scores, cs_total_weighted, it_total_weighted, general_keywords,
+                interpretation, enhancement_suggestion, keyword_table.version,
+            ))
+    DOCUMENTS.inc(result=final_decision)
     
-    print("\n🔹Keywords(Tokenized)  (DEBUG):", extracted_keywords)  # Debugging 
+    logger.debug(f"\n🔹Keywords(Tokenized)  (DEBUG): {extracted_keywords}")  # Debugging
    
    # Flatten keywords for display
     all_keywords = []
@@ -318,98 +459,380 @@ def process_pdf(filename):
 
     
 
-    return title_text, cs_scores, it_scores, cs_total_weighted, it_total_weighted, general_keywords, interpretation, enhancement_suggestion 
+    return title_text, cs_scores, it_scores, cs_total_weighted, it_total_weighted, general_keywords, interpretation, enhancement_suggestion, keyword_table.version
     #return title_text, cs_scores, it_scores, cs_total_weighted, it_total_weighted, flattened_keywords, interpretation, enhancement_suggestion
 
 
 
-def save_results_to_excel(cs_scores, it_scores, cs_total, it_total):
-    """Saves classification results to an Excel file."""
-    interpretation = (
-        "Minimal Alignment" if cs_total < 60 else
-        "Basic Alignment" if cs_total < 70 else
-        "Moderate Alignment" if cs_total < 80 else
-        "Strong Alignment" if cs_total < 90 else
-        "Very Strong Alignment" if cs_total < 100 else
-        "Full Alignment"
-    )
-
-
-    data = {
-        "Key Sections": [
-            "Title (25%)", "Introduction (25%)", 
-            "Objectives (25%)", "Scope and Limitations (25%)", 
-            "Overall Total", "Interpretation", "Final Decision"
-        ],
-        "Computer Science Scores": [
-            cs_scores.get("title", 0), cs_scores.get("introduction", 0), 
-            cs_scores.get("objectives", 0), cs_scores.get("scope", 0), 
-            cs_total, interpretation, "CS" if cs_total > it_total else "IT"
-        ],
-        "Information Technology Scores": [
-            it_scores.get("title", 0), it_scores.get("introduction", 0), 
-            it_scores.get("objectives", 0), it_scores.get("scope", 0), 
-            it_total, interpretation, "CS" if cs_total > it_total else "IT"
-        ]
+def save_result(filename, selected_course, result):
+    """Appends one classification to the results store (one INSERT, however
+    much history exists)."""
+    try:
+        get_results_store().append(dict(result_row(*result), file=filename, selected_course=selected_course))
+    except Exception as e:
+        logger.error(f"[ERROR] Failed to save results: {e}")
+
+def find_similar(upload, title, extracted_text):
+    """Returns the earlier proposals most similar to an upload (see
+    `SimilarityIndex.query`), then adds the upload to the index unless the
+    same bytes were indexed before. `extracted_text` is the upload's sections
+    from `extract_sections`."""
+    if not SIMILARITY_INDEX:
+        return []
+    try:
+        with timed("similarity"):
+            signature = signature_of(extracted_text)
+            if signature is None:
+                return []
+            digest = content_digest(upload.source)
+            index = get_similarity_index()
+            similar = index.query(signature, digest=digest)
+            index.add(signature, upload.filename, title, digest)
+        return similar
+    except Exception as e:
+        logger.error(f"[ERROR] Similar proposal lookup failed: {e}")
+        return []
+
+def result_context(result, selected_course, similar=()):
+    """Maps a `process_pdf` result onto the variables result.html expects."""
+    title, cs_scores, it_scores, cs_total, it_total, general_keywords, interpretation, enhancement_suggestion, keyword_version = result
+    return {
+        "title": title,
+        "cs_scores": cs_scores,
+        "it_scores": it_scores,
+        "cs_total": cs_total,
+        "it_total": it_total,
+        "extracted_keywords": general_keywords,
+        "selected_course": selected_course,
+        "interpretation": interpretation,
+        "enhancement_suggestion": enhancement_suggestion,
+        "keyword_version": keyword_version,
+        "similar": list(similar),
     }
 
-    df = pd.DataFrame(data)
-    
-    # Save to Excel with formatting
-    with pd.ExcelWriter(RESULTS_PATH, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False, sheet_name="Results")
+def classify_upload(report, upload, selected_course):
+    """Background job: publishes the title early, then runs the full pipeline.
+    The upload is archived (if enabled) and freed when the job ends."""
+    try:
+        report(title=sandboxed(extract_title_from_pdf, upload.source))
+
+        extracted_text = extract_sections(upload.source)
+        result = process_pdf(upload.filename, selected_course=selected_course, source=upload.source,
+                             extracted_text=extracted_text)
+        if result[0] is None:
+            raise ValueError("Could not extract text from this PDF.")
+        return result_context(result, selected_course, find_similar(upload, result[0], extracted_text))
+    finally:
+        release_upload(upload)
+
+def receive_upload():
+    """Reads the uploaded PDF into memory (spooled to a temp file if large);
+    returns `(Upload, selected_course)` or None."""
+    file = request.files.get("file")
+    selected_course = request.form.get("selected_course")  #  Get course selection
+    logger.info(f"\n✅ Selected Course (from form): {selected_course}\n")
+
+    if not (file and file.filename.endswith(".pdf")):
+        logger.error("[ERROR] No file uploaded or invalid file type.")
+        return None
+
+    return Upload.receive(file), selected_course
 
-        # Apply Formatting
-        workbook = writer.book
-        worksheet = writer.sheets["Results"]
-        format_red = workbook.add_format({'bg_color': '#FF9999', 'bold': True})
-        format_yellow = workbook.add_format({'bg_color': '#FFF2CC', 'bold': True})
+def submit_upload(upload, selected_course):
+    """Queues the classification job; a rejected upload is freed right away."""
+    try:
+        return job_queue.submit(classify_upload, upload, selected_course)
+    except QueueFull:
+        upload.close()
+        raise
 
-        worksheet.set_column("A:C", 25)
-        worksheet.conditional_format("A6:C6", {"type": "no_blanks", "format": format_red})
-        worksheet.conditional_format("A7:C7", {"type": "no_blanks", "format": format_yellow})
-        worksheet.conditional_format("A8:C8", {"type": "no_blanks", "format": format_yellow})
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    """Rejects request bodies over MAX_REQUEST_BYTES, in the route's own format."""
+    message = f"Uploads are limited to {MAX_REQUEST_BYTES // (1024 * 1024)} MB per request."
+    if request.path == "/":
+        return render_template("index.html", error=message), 413
+    return jsonify({"error": message}), 413
 
 @app.route("/", methods=["GET", "POST"])
 def index():
     """Handles file upload and classification processing."""
     if request.method == "POST":
-        file = request.files.get("file")
-        selected_course = request.form.get("selected_course")  #  Get course selection
-        print(f"\n✅ Selected Course (from form): {selected_course}\n")
-
-        if file and file.filename.endswith(".pdf"):
-            filepath = os.path.join(app.config["UPLOAD_FOLDER"], file.filename)
-            file.save(filepath)
-
+        received = receive_upload()
+        if received is None:
+            return render_template("index.html", error="Please upload a valid PDF file.")
+        upload, selected_course = received
+
+        if ASYNC_UPLOADS:
+            try:
+                job_id = submit_upload(upload, selected_course)
+            except QueueFull:
+                logger.warning("[WARNING] Job queue is full, rejecting upload.")
+                return render_template("index.html", error="The server is busy, please try again shortly."), 503, {"Retry-After": "10"}
+            return redirect(url_for("job_view", job_id=job_id))
+
+        # Process the uploaded PDF straight from memory
+        try:
+            extracted_text = extract_sections(upload.source)
+            result = process_pdf(upload.filename, selected_course=selected_course, source=upload.source,
+                                 extracted_text=extracted_text)
+        except ExtractionError as e:
+            upload.close()
+            return render_template("index.html", error=e.message), 422
+        except Exception:
+            upload.close()
+            raise
+
+        if result[0] is None:
+            response = make_response(render_template("index.html", error="Could not extract text from this PDF."))
+        else:
+            context = result_context(result, selected_course, find_similar(upload, result[0], extracted_text))
+            response = make_response(render_template("result.html", **context))
+        # Archiving (if enabled) waits until the page has been sent
+        response.call_on_close(lambda: release_upload(upload))
+        return response
 
+    # Render the index page for GET requests
+    return render_template("index.html")
 
-            # Process the uploaded PDF
-            title, cs_scores, it_scores, cs_total, it_total, general_keywords, interpretation, enhancement_suggestion= process_pdf(file.filename)
+@app.before_request
+def require_async_uploads():
+    """Turns the job routes off when uploads are classified synchronously.
+
+    Jobs live in one process's memory, so with several server workers (see
+    serve.py, which sets ASYNC_UPLOADS=0) a poll could reach a worker that
+    never saw the job and get a spurious 404.
+    """
+    if not ASYNC_UPLOADS and request.endpoint in ("submit_job", "job_status", "job_view"):
+        return jsonify({"error": "Background jobs are disabled on this server, use /api/classify."}), 404
+
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    """Queues an uploaded PDF for classification and returns its job id."""
+    received = receive_upload()
+    if received is None:
+        return jsonify({"error": "Please upload a valid PDF file."}), 400
+
+    try:
+        job_id = submit_upload(*received)
+    except QueueFull:
+        return jsonify({"error": "Job queue is full, retry later."}), 503, {"Retry-After": "10"}
+
+    return jsonify({
+        "job_id": job_id,
+        "status_url": url_for("job_status", job_id=job_id),
+        "result_url": url_for("job_view", job_id=job_id),
+    }), 202
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Job status as JSON; carries the title as soon as it is known and the
+    full result once the job is done."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    return jsonify({
+        "id": job["id"],
+        "status": job["status"],
+        "title": job["progress"].get("title"),
+        "result": job["result"],
+        "error": job["error"],
+    })
+
+@app.route("/jobs/<job_id>/view")
+def job_view(job_id):
+    """Result page for a job; shows a polling page until the job finishes."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return render_template("index.html", error="This result has expired, please upload the file again."), 404
+
+    if job["status"] == "done":
+        return render_template("result.html", **job["result"])
+    if job["status"] == "failed":
+        return render_template("index.html", error=job["error"])
+
+    return render_template("pending.html", job_id=job_id, title=job["progress"].get("title"))
+
+def reserve_api_slots(count):
+    """Claims `count` of the API_QUEUE_SIZE slots, all or none; returns False
+    when the API is too busy to take them."""
+    global api_in_flight
+    with api_lock:
+        if api_in_flight + count > API_QUEUE_SIZE:
+            return False
+        api_in_flight += count
+        return True
+
+def release_api_slot(_=None):
+    global api_in_flight
+    with api_lock:
+        api_in_flight -= 1
+
+def classify_api_file(upload):
+    """Runs the pipeline on one API upload and returns its NDJSON record."""
+    extracted_text = extract_sections(upload.source)
+    result = process_pdf(upload.filename, source=upload.source, extracted_text=extracted_text)
+    if result[0] is None:
+        raise ValueError("Could not extract text from this PDF.")
+
+    title, cs_scores, it_scores, cs_total, it_total, general_keywords, interpretation, enhancement_suggestion, keyword_version = result
+    return {
+        "title": title,
+        "cs_scores": cs_scores,
+        "it_scores": it_scores,
+        "cs_total": cs_total,
+        "it_total": it_total,
+        "general_keywords": general_keywords,
+        "interpretation": interpretation,
+        "enhancement_suggestion": enhancement_suggestion,
+        "keyword_version": keyword_version,
+        "similar": find_similar(upload, title, extracted_text),
+    }
 
-            
-            return render_template(
-                "result.html",
-                title=title,
-                cs_scores=cs_scores,
-                it_scores=it_scores,
-                cs_total=cs_total,
-                it_total=it_total,
-                extracted_keywords=general_keywords,
-                selected_course=selected_course,
-                interpretation=interpretation,  
-                enhancement_suggestion=enhancement_suggestion,
-                
-                
+@app.route("/api/classify", methods=["POST"])
+def api_classify():
+    """Classifies every PDF in a multipart request (field `files`) concurrently.
+
+    The response is NDJSON: one line per document, written as soon as that
+    document finishes, so the first result does not wait for the whole batch.
+    Each line has the document's `index` in the request and its `file` name,
+    plus either the `process_pdf` fields and the `similar` earlier proposals,
+    or an `error`. A request whose files would take the API past
+    API_QUEUE_SIZE queued or running files is rejected with 503.
+    """
+    files = request.files.getlist("files") or request.files.getlist("file")
+    if not files:
+        return jsonify({"error": "Upload one or more PDFs in the 'files' field."}), 400
+    if len(files) > API_MAX_FILES:
+        return jsonify({"error": f"At most {API_MAX_FILES} files per request."}), 413
+
+    pdfs = []
+    rejected = []
+    for index, file in enumerate(files):
+        filename = os.path.basename(file.filename or "")
+        if filename.lower().endswith(".pdf"):
+            pdfs.append((index, filename, file))
+        else:
+            rejected.append({"index": index, "file": filename, "error": "Not a PDF file."})
+    if not reserve_api_slots(len(pdfs)):
+        logger.warning("[WARNING] API queue is full, rejecting request.")
+        return jsonify({"error": "The server is busy, retry later."}), 503, {"Retry-After": "10"}
+
+    # Each file is held in its own Upload, so same-named files cannot clash.
+    # Once API_MEMORY_BYTES are held in memory, later files go to temp files.
+    futures = {}
+    memory_left = API_MEMORY_BYTES
+    try:
+        for index, filename, file in pdfs:
+            upload = Upload.receive(file, spool_bytes=min(UPLOAD_SPOOL_BYTES, memory_left))
+            if upload.data is not None:
+                memory_left -= len(upload.data)
+            try:
+                future = api_executor.submit(classify_api_file, upload)
+            except Exception:
+                upload.close()
+                raise
+            # Archive/free each upload and its slot once its record is ready (or it was cancelled)
+            future.add_done_callback(lambda _, upload=upload: release_upload(upload))
+            future.add_done_callback(release_api_slot)
+            futures[future] = (index, filename)
+    except Exception:
+        for future in futures:
+            future.cancel()
+        for _ in range(len(pdfs) - len(futures)):
+            release_api_slot()  # Never submitted
+        raise
+
+    def generate():
+        try:
+            for record in rejected:
+                yield json.dumps(record) + "\n"
+            for future in as_completed(futures):
+                index, filename = futures[future]
+                record = {"index": index, "file": filename}
+                try:
+                    record.update(future.result())
+                except ExtractionError as e:
+                    record.update(e.as_dict())
+                except Exception as e:
+                    logger.error(f"[ERROR] Failed to classify {filename}: {e}")
+                    record["error"] = str(e) or type(e).__name__
+                yield json.dumps(record) + "\n"
+        finally:
+            # Client went away: drop the files that have not started yet
+            for future in futures:
+                future.cancel()
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+@app.route("/results/export")
+def export_results():
+    """Downloads the stored results as CSV (streamed) or XLSX, generated on demand.
+
+    `?format=csv|xlsx` picks the format and `?limit=N` keeps only the latest N rows.
+    """
+    export_format = request.args.get("format", "xlsx")
+    limit = request.args.get("limit", type=int)
+    store = get_results_store()
+
+    if export_format == "csv":
+        return Response(
+            store.iter_csv(limit),
+            mimetype="text/csv",
+            headers={"Content-Disposition": "attachment; filename=classification_results.csv"},
         )
+    if export_format != "xlsx":
+        return jsonify({"error": "format must be csv or xlsx"}), 400
+
+    output = io.BytesIO()
+    store.export_xlsx(output, limit)
+    output.seek(0)
+    return send_file(output, as_attachment=True, download_name="classification_results.xlsx",
+                     mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+@app.route("/metrics")
+def metrics():
+    """Per-stage latency histograms and document counters in Prometheus text format.
+
+    Stages: extraction (including the cache lookup) and, on cache misses,
+    pdf_open, title_layout, text_extraction and segmentation; then
+    keyword_load, then (on classification cache misses) tokenization,
+    exact_match, fuzzy_match and scoring, and finally persistence and (for
+    uploads) similarity. Values are per process.
+    """
+    gauges = {
+        "classifier_extraction_cache": {(("stat", name),): value for name, value in extraction_cache_stats().items()},
+        "classifier_classification_cache": {
+            (("stat", name),): value for name, value in classification_cache_stats().items()
+        },
+        "classifier_jobs": {(("state", name),): value for name, value in job_queue.stats().items()},
+        "classifier_api_files": {(("state", "in_flight"),): api_in_flight, (("state", "limit"),): API_QUEUE_SIZE},
+        "classifier_evaluation": {
+            (("metric", name),): value for name, value in get_confusion_matrix().metrics().items()
+            if name in ("samples", "accuracy", "precision", "recall", "f1")
+        },
+    }
+    if extraction_pool is not None:
+        gauges["classifier_extraction_pool"] = {(("stat", name),): value for name, value in extraction_pool.stats().items()}
+    return Response(render_metrics(gauges), mimetype="text/plain; version=0.0.4")
 
-        else:
-            print("[ERROR] No file uploaded or invalid file type.")
-            return render_template("index.html", error="Please upload a valid PDF file.")
+@app.route("/cache/stats")
+def cache_stats():
+    """Reports extraction and classification cache hit/miss counters for sizing the caches."""
+    return jsonify({"extraction": extraction_cache_stats(), "classification": classification_cache_stats()})
 
-    # Render the index page for GET requests
-    return render_template("index.html")
+@app.route("/evaluation")
+def evaluation():
+    """Corpus-level accuracy and macro precision, recall and F1 of the saved
+    results that have a ground truth label, with the confusion counts."""
+    return jsonify(get_confusion_matrix().metrics())
 
 
 if __name__ == "__main__":
+    # The debug reloader serves from a child process (WERKZEUG_RUN_MAIN set);
+    # warm up there, before it starts threads, so the extraction pool is not
+    # forked lazily from the threaded server on the first upload.
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_up()
     app.run(debug=True)
@@ -0,0 +1,83 @@
+"""Rebuilds the similar-proposal index from a folder of PDFs.
+
+Run from the repository root:
+
+    python app/reindex.py uploads --workers 4 --pairs
+
+Every PDF's sections are extracted (through the extraction cache) on a pool
+of worker processes and MinHashed, then the MinHash/LSH index in the results
+database is replaced with the folder's signatures in one transaction.
+`--pairs` lists the near-duplicate pairs found within the folder.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+# Workers are already separate processes; parse PDFs in them directly
+os.environ.setdefault("SANDBOX_EXTRACTION", "0")
+
+from main import MAX_PDF_PAGES, STREAMING_EXTRACTION
+from utils.extraction_cache import cached_extract_text_from_pdf, content_digest
+from utils.similarity_index import get_similarity_index, signature_of
+
+
+def signature_file(pdf_path):
+    """Returns `(signature or None, title or error, digest)` for one PDF."""
+    with redirect_stdout(io.StringIO()):
+        try:
+            digest = content_digest(pdf_path)
+            sections = cached_extract_text_from_pdf(pdf_path, streaming=STREAMING_EXTRACTION, max_pages=MAX_PDF_PAGES)
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}", None
+    if not sections:
+        return None, "no text could be extracted", digest
+    return signature_of(sections), sections.get("title"), digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", help="Folder holding the PDFs to index")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--pairs", action="store_true", help="List the near-duplicate pairs within the folder")
+    args = parser.parse_args()
+
+    names = sorted(name for name in os.listdir(args.folder) if name.lower().endswith(".pdf"))
+    if not names:
+        print(f"[ERROR] No PDF files found in {args.folder}.")
+        sys.exit(1)
+
+    print(f"🔹 Indexing {len(names)} PDF(s) from {args.folder} ...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(signature_file, [os.path.join(args.folder, name) for name in names]))
+
+    entries = []
+    for name, (signature, title, digest) in zip(names, results):
+        if signature is None:
+            print(f"[WARNING] Skipping {name}: {title or 'no text'}")
+            continue
+        entries.append((signature, name, title, digest))
+
+    index = get_similarity_index()
+    count = index.rebuild(entries)
+    print(f"\n✅ Indexed {count} distinct of {len(names)} PDF(s) in {time.perf_counter() - start:.2f}s ({index.path})")
+
+    if args.pairs:
+        seen = set()
+        for signature, name, _, digest in entries:
+            for match in index.query(signature, k=len(entries), digest=digest):
+                pair = tuple(sorted((name, match["file"])))
+                if match["file"] == name or pair in seen:
+                    continue
+                seen.add(pair)
+                print(f"   {match['similarity'] * 100:5.1f}%  {pair[0]}  ~  {pair[1]}")
+        if not seen:
+            print("   No near-duplicate pairs found.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Serves the app with gunicorn's pre-fork workers, for production.
+
+Run from the repository root:
+
+    python app/serve.py --bind 0.0.0.0:8000 --workers 8 --threads 4
+
+The app, the heavy PDF/NLP/NumPy modules, the tokenizer data, the keyword
+table and the ground truth are loaded once in the master process; the frozen
+heap (`gc.freeze`) is then shared copy-on-write by every forked worker, so a
+worker starts serving at once and only its own allocations cost memory. Each
+worker serves `--threads` requests concurrently, and is replaced after
+`--max-requests` (plus up to `--max-requests-jitter`) requests to bound slow
+leaks; a replacement is forked from the same preloaded master.
+
+Every setting can also come from the environment (SERVE_BIND, SERVE_WORKERS,
+SERVE_THREADS, SERVE_MAX_REQUESTS, SERVE_MAX_REQUESTS_JITTER, SERVE_TIMEOUT).
+Uploads are classified inside the request (ASYNC_UPLOADS=0) and the /jobs
+routes are off, because background jobs live in one worker's memory and a
+later poll may reach another worker; ASYNC_UPLOADS=1 is refused with more
+than one worker. Each worker starts its own PDF extraction
+pool, EXTRACTION_WORKERS processes (default: one per thread).
+"""
+import argparse
+import gc
+import os
+import sys
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    print("[ERROR] gunicorn is required for serve.py: pip install gunicorn")
+    sys.exit(1)
+
+SERVE_BIND = os.environ.get("SERVE_BIND", "127.0.0.1:8000")
+SERVE_WORKERS = int(os.environ.get("SERVE_WORKERS", str(os.cpu_count() or 1)))
+SERVE_THREADS = int(os.environ.get("SERVE_THREADS", "4"))
+# Recycle a worker after this many requests (0 = never), staggered by the jitter
+SERVE_MAX_REQUESTS = int(os.environ.get("SERVE_MAX_REQUESTS", "1000"))
+SERVE_MAX_REQUESTS_JITTER = int(os.environ.get("SERVE_MAX_REQUESTS_JITTER", "100"))
+SERVE_TIMEOUT = int(os.environ.get("SERVE_TIMEOUT", "120"))
+
+TEMPLATES = ["index.html", "pending.html", "result.html"]
+
+
+def post_fork(server, worker):
+    """Starts this worker's extraction pool; its zygote is forked from the
+    still single-threaded worker and inherits the preloaded modules."""
+    import main
+
+    if main.extraction_pool is not None:
+        main.extraction_pool.start()
+
+
+def worker_exit(server, worker):
+    import main
+
+    if main.extraction_pool is not None:
+        main.extraction_pool.close()
+
+
+class ClassifierServer(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        """Imports and warms up the app; with preload_app this runs once, in
+        the master, before any worker is forked."""
+        import main
+
+        main.warm_up(start_extraction_pool=False)
+        for template in TEMPLATES:
+            main.app.jinja_env.get_template(template)  # Compile once, share with every worker
+
+        # Move everything loaded so far out of the collector's reach, so
+        # collections in the workers do not touch (and un-share) those pages.
+        gc.collect()
+        gc.freeze()
+        return main.app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", default=SERVE_BIND, help="Address to listen on (host:port or unix:path)")
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS, help="Worker processes (default: CPU count)")
+    parser.add_argument("--threads", type=int, default=SERVE_THREADS, help="Request threads per worker")
+    parser.add_argument("--max-requests", type=int, default=SERVE_MAX_REQUESTS,
+                        help="Requests before a worker is replaced (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=SERVE_MAX_REQUESTS_JITTER)
+    parser.add_argument("--timeout", type=int, default=SERVE_TIMEOUT, help="Seconds before a silent worker is killed")
+    args = parser.parse_args()
+
+    # Read by main at import time, so set before load() imports it
+    os.environ.setdefault("ASYNC_UPLOADS", "0")
+    os.environ.setdefault("EXTRACTION_WORKERS", str(args.threads))
+    if os.environ["ASYNC_UPLOADS"] != "0" and args.workers > 1:
+        print("[ERROR] ASYNC_UPLOADS=1 needs --workers 1: a job's status polls must reach the worker that runs it.")
+        sys.exit(1)
+
+    ClassifierServer({
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "gthread",
+        "threads": args.threads,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter,
+        "timeout": args.timeout,
+        "preload_app": True,
+        "post_fork": post_fork,
+        "worker_exit": worker_exit,
+        "accesslog": "-",
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
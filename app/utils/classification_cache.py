@@ -0,0 +1,50 @@
+import hashlib
+import os
+
+from utils.cache import DiskCache, LRUCache, TieredCache
+from utils.nlp_processor import tokenizer_name
+
+# Bump whenever matching, scoring or the interpretation text changes output, so
+# results memoized by older code are not reused.
+CLASSIFIER_VERSION = "1"
+
+CLASSIFICATION_CACHE_MEMORY_ENTRIES = int(os.environ.get("CLASSIFICATION_CACHE_MEMORY_ENTRIES", 4096))
+CLASSIFICATION_CACHE_MEMORY_BYTES = int(os.environ.get("CLASSIFICATION_CACHE_MEMORY_BYTES", 32 * 1024 * 1024))
+# Optional persistent tier, e.g. CLASSIFICATION_CACHE_DIR=app/cache/classification
+CLASSIFICATION_CACHE_DIR = os.environ.get("CLASSIFICATION_CACHE_DIR", "")
+CLASSIFICATION_CACHE_MAX_BYTES = int(os.environ.get("CLASSIFICATION_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+_cache = None
+
+
+def get_classification_cache():
+    """Returns the process-wide classification cache (memory, plus disk if configured)."""
+    global _cache
+    if _cache is None:
+        disk = None
+        if CLASSIFICATION_CACHE_DIR:
+            disk = DiskCache(CLASSIFICATION_CACHE_DIR, max_bytes=CLASSIFICATION_CACHE_MAX_BYTES)
+        _cache = TieredCache(
+            LRUCache(CLASSIFICATION_CACHE_MEMORY_ENTRIES, max_bytes=CLASSIFICATION_CACHE_MEMORY_BYTES),
+            disk,
+        )
+    return _cache
+
+
+def classification_key(sections, keyword_table):
+    """SHA-256 over the normalized section texts, plus the keyword table's
+    content hash, the classifier version and the tokenizer. Editing the
+    keyword CSV changes the table hash, so stale results are never hit."""
+    digest = hashlib.sha256()
+    for section in sorted(sections):
+        text = sections[section].lower().replace("-", " ").replace("_", " ")
+        for part in (section, text):
+            encoded = part.encode("utf-8")
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+    return f"{digest.hexdigest()}-{keyword_table.content_hash[:16]}-v{CLASSIFIER_VERSION}-{tokenizer_name()}"
+
+
+def classification_cache_stats():
+    """Hit/miss counters of the classification cache."""
+    return get_classification_cache().snapshot()
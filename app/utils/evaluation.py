@@ -0,0 +1,239 @@
+import csv
+import os
+import sqlite3
+import threading
+import time
+
+from utils.results_store import RESULTS_DB_PATH
+
+EVALUATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    document TEXT PRIMARY KEY,
+    actual TEXT NOT NULL,
+    predicted TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+)
+"""
+COUNTS_TABLE = """
+CREATE TABLE IF NOT EXISTS confusion_counts (
+    actual TEXT NOT NULL,
+    predicted TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (actual, predicted)
+)
+"""
+
+# The first release kept bare counts in `confusion`, which counted every
+# re-upload again; they cannot be split per document, so they are dropped.
+LEGACY_TABLES = ["confusion"]
+
+
+def normalize_title(text):
+    """Lowercases and removes unnecessary characters for better matching."""
+    return text.lower().replace("-", " ").strip()
+
+
+class GroundTruth:
+    """Labeled titles from the ground truth CSV, indexed by normalized title."""
+
+    def __init__(self, labels):
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.labels)
+
+    def key_for(self, filename):
+        """The normalized title an uploaded file name is matched on."""
+        return normalize_title(os.path.splitext(filename)[0])
+
+    def label_for(self, filename):
+        """The labeled field for an uploaded file name (matched on its title), or None."""
+        return self.labels.get(self.key_for(filename))
+
+    @classmethod
+    def from_file(cls, file):
+        labels = {}
+        for row in csv.DictReader(file):
+            title, field = (row.get("title") or "").strip(), (row.get("field") or "").strip()
+            if title and field:
+                labels[normalize_title(title)] = field
+        return cls(labels)
+
+
+_ground_truth = {}
+_ground_truth_lock = threading.Lock()
+
+
+def get_ground_truth(csv_path):
+    """Returns the process-wide GroundTruth for `csv_path`.
+
+    Like the keyword table, the CSV is parsed once and only re-read when its
+    mtime or size changes, so a lookup normally costs one `os.stat` and one
+    dict access. A missing file gives an empty ground truth.
+    """
+    path = os.path.abspath(csv_path)
+    try:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = None
+
+    cached = _ground_truth.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with _ground_truth_lock:
+        cached = _ground_truth.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        if stamp is None:
+            print("[WARNING] Ground truth file not found. Evaluation metrics will not be computed.")
+            ground_truth = GroundTruth({})
+        else:
+            try:
+                with open(path, "r", encoding="utf-8", newline="") as file:
+                    ground_truth = GroundTruth.from_file(file)
+            except (OSError, UnicodeDecodeError, csv.Error) as e:
+                if cached is None:
+                    raise
+                print(f"❌ [ERROR] Failed to reload {csv_path}, keeping the previous labels: {e}")
+                ground_truth = cached[1]
+            else:
+                print(f"🔹 Loaded {len(ground_truth)} ground truth labels from {csv_path}")
+
+        _ground_truth[path] = (stamp, ground_truth)
+        return ground_truth
+
+
+def macro_metrics(counts):
+    """Accuracy plus macro-averaged precision, recall and F1 from confusion
+    counts `{(actual, predicted): n}`, over every label seen on either side.
+    Undefined ratios count as 0, as with scikit-learn's `zero_division=0`."""
+    labels = sorted({label for pair in counts for label in pair})
+    samples = sum(counts.values())
+    correct = sum(counts.get((label, label), 0) for label in labels)
+
+    precisions, recalls, f1s = [], [], []
+    for label in labels:
+        true_positives = counts.get((label, label), 0)
+        predicted = sum(n for (_, p), n in counts.items() if p == label)
+        actual = sum(n for (a, _), n in counts.items() if a == label)
+        precision = true_positives / predicted if predicted else 0.0
+        recall = true_positives / actual if actual else 0.0
+        precisions.append(precision)
+        recalls.append(recall)
+        f1s.append(2 * precision * recall / (precision + recall) if precision + recall else 0.0)
+
+    def mean(values):
+        return sum(values) / len(values) if values else 0.0
+
+    return {
+        "samples": samples,
+        "labels": labels,
+        "accuracy": correct / samples if samples else 0.0,
+        "precision": mean(precisions),
+        "recall": mean(recalls),
+        "f1": mean(f1s),
+        "confusion": {f"{actual}->{predicted}": n for (actual, predicted), n in sorted(counts.items())},
+    }
+
+
+class ConfusionMatrix:
+    """Running confusion matrix of predictions against the ground truth,
+    stored in the results database.
+
+    Only the latest prediction per labeled document (its normalized title) is
+    kept, so re-uploading a document replaces its earlier prediction instead
+    of counting it again. The (actual, predicted) counts are kept up to date
+    in the same transaction, so recording costs a few row updates and reading
+    the metrics one SELECT of at most labels x labels rows, however many
+    documents have been evaluated; every process sees the same counts.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as connection:
+            self._migrate(connection)
+
+    def _migrate(self, connection):
+        """Creates the tables; drops the legacy ones and fills the counts from
+        stored predictions only when needed, under one write lock, so workers
+        starting together do it once."""
+        connection.execute("BEGIN IMMEDIATE")
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in LEGACY_TABLES:
+            if table in tables:
+                connection.execute(f"DROP TABLE {table}")
+        connection.execute(EVALUATIONS_TABLE)
+        if "confusion_counts" not in tables:
+            connection.execute(COUNTS_TABLE)
+            connection.execute(
+                "INSERT INTO confusion_counts (actual, predicted, count) "
+                "SELECT actual, predicted, COUNT(*) FROM evaluations GROUP BY actual, predicted"
+            )
+
+    def _connection(self):
+        """One connection per thread; sqlite3 connections must not be shared."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def record(self, document, actual, predicted):
+        """Stores the prediction for `document`, replacing any earlier one, and
+        moves the document's count from its old cell to the new one."""
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")  # No other writer between the read and the updates
+            previous = connection.execute(
+                "SELECT actual, predicted FROM evaluations WHERE document = ?", (document,)
+            ).fetchone()
+            connection.execute(
+                "INSERT INTO evaluations (document, actual, predicted, recorded_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (document) DO UPDATE SET "
+                "actual = excluded.actual, predicted = excluded.predicted, recorded_at = excluded.recorded_at",
+                (document, actual, predicted, time.strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            if previous == (actual, predicted):
+                return
+            if previous is not None:
+                connection.execute(
+                    "UPDATE confusion_counts SET count = count - 1 WHERE actual = ? AND predicted = ?", previous
+                )
+                connection.execute("DELETE FROM confusion_counts WHERE count <= 0")
+            connection.execute(
+                "INSERT INTO confusion_counts (actual, predicted, count) VALUES (?, ?, 1) "
+                "ON CONFLICT (actual, predicted) DO UPDATE SET count = count + 1",
+                (actual, predicted),
+            )
+
+    def counts(self):
+        rows = self._connection().execute("SELECT actual, predicted, count FROM confusion_counts")
+        return {(actual, predicted): count for actual, predicted, count in rows}
+
+    def metrics(self):
+        return macro_metrics(self.counts())
+
+    def reset(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM evaluations")
+            connection.execute("DELETE FROM confusion_counts")
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def get_confusion_matrix():
+    """Returns the process-wide confusion matrix, creating its table on first use."""
+    global _matrix
+    if _matrix is None:
+        with _matrix_lock:
+            if _matrix is None:
+                _matrix = ConfusionMatrix(RESULTS_DB_PATH)
+    return _matrix
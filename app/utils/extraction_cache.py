@@ -0,0 +1,70 @@
+import hashlib
+import os
+
+from utils.cache import DiskCache, LRUCache, TieredCache
+from utils.pdf_analyzer import EXTRACTOR_VERSION, extract_text_from_pdf
+
+EXTRACTION_CACHE_DIR = os.environ.get("EXTRACTION_CACHE_DIR", "app/cache/extraction")
+EXTRACTION_CACHE_MAX_BYTES = int(os.environ.get("EXTRACTION_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+EXTRACTION_CACHE_MEMORY_ENTRIES = int(os.environ.get("EXTRACTION_CACHE_MEMORY_ENTRIES", 256))
+
+_cache = None
+
+
+def get_extraction_cache():
+    """Returns the process-wide extraction cache, creating its directory on first use."""
+    global _cache
+    if _cache is None:
+        _cache = TieredCache(
+            LRUCache(EXTRACTION_CACHE_MEMORY_ENTRIES),
+            DiskCache(EXTRACTION_CACHE_DIR, max_bytes=EXTRACTION_CACHE_MAX_BYTES),
+        )
+    return _cache
+
+
+def content_digest(source):
+    """SHA-256 of a PDF given as bytes or a path; files are hashed in chunks so
+    large spooled uploads are never loaded into memory whole."""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+
+    digest = hashlib.sha256()
+    with open(source, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extraction_key(source, streaming=False, max_pages=None):
+    """Content address of a PDF: SHA-256 of its bytes plus the extractor version
+    and the options that can change the extracted sections."""
+    mode = "stream" if streaming else "full"
+    if max_pages:
+        mode += f"{max_pages}"
+    return f"{content_digest(source)}-v{EXTRACTOR_VERSION}-{mode}"
+
+
+def cached_extract_text_from_pdf(pdf_path, streaming=False, max_pages=None, extract=extract_text_from_pdf):
+    """`extract_text_from_pdf` that skips parsing when the same bytes were seen
+    before. `pdf_path` may also be the PDF's bytes. `extract` replaces the
+    parser on a miss (e.g. to run it in the sandboxed extraction pool)."""
+    try:
+        key = extraction_key(pdf_path, streaming, max_pages)
+    except OSError as e:
+        print(f"[ERROR] Failed to read PDF: {e}")
+        return {}
+
+    cache = get_extraction_cache()
+    sections = cache.get(key)
+    if sections is not None:
+        return dict(sections)
+
+    sections = extract(pdf_path, streaming=streaming, max_pages=max_pages)
+    if sections:  # Never cache failures; a retry may succeed
+        cache.put(key, sections)
+    return dict(sections)
+
+
+def extraction_cache_stats():
+    """Hit/miss counters of the extraction cache."""
+    return get_extraction_cache().snapshot()
@@ -0,0 +1,314 @@
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from multiprocessing import reduction
+from multiprocessing.connection import Connection
+
+from utils.metrics import capture_stages, replay_stages
+
+logger = logging.getLogger(__name__)
+
+# How often a waiting caller checks the worker's deadline and memory
+POLL_INTERVAL = 0.05
+
+MESSAGES = {
+    "timeout": "PDF extraction took longer than {timeout:g}s and was stopped.",
+    "memory": "PDF extraction used more than {max_rss_mb} MB of memory and was stopped.",
+    "crashed": "The PDF extraction worker crashed on this file.",
+    "busy": "No PDF extraction worker became free in time, please retry.",
+    "unavailable": "No PDF extraction worker could be started, please retry later.",
+}
+
+
+class ExtractionError(Exception):
+    """Raised by `ExtractionPool.call` when a document could not be processed.
+
+    `reason` is "timeout", "memory", "crashed", "busy", "unavailable" or
+    "error" (the function itself raised), so callers can report a structured
+    error.
+    """
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+        self.message = message
+
+    def as_dict(self):
+        return {"error": self.message, "reason": self.reason}
+
+
+def rss_mb(pid="self"):
+    """Resident set size of a process in MB, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as file:
+            pages = int(file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def worker_main(conn):
+    """Worker loop: runs `(function, args, kwargs)` tasks until told to stop."""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+
+        function, args, kwargs = task
+        with capture_stages() as stages:
+            try:
+                status, value = "ok", function(*args, **kwargs)
+            except Exception as e:
+                status, value = "error", f"{type(e).__name__}: {e}"
+        conn.send((status, value, stages, rss_mb()))
+
+
+def zygote_main(conn, parent_conn=None):
+    """Fork server: forks one worker for every socket handed over on `conn`
+    and replies with its pid. It stays single-threaded, so workers are never
+    forked from the threaded web process."""
+    if parent_conn is not None:
+        parent_conn.close()  # Inherited copy; it would keep `conn` from seeing EOF
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Shutdown is the parent's job
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)  # Not a handler inherited from a server worker
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # Exited workers are reaped automatically
+    while True:
+        try:
+            fd = reduction.recv_handle(conn)
+        except (EOFError, OSError):
+            break
+        pid = os.fork()
+        if pid == 0:
+            conn.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            try:
+                worker_main(Connection(fd))
+            finally:
+                os._exit(0)
+        os.close(fd)
+        conn.send(pid)
+
+
+class Worker:
+    def __init__(self, conn, pid):
+        self.conn = conn
+        self.pid = pid
+        self.tasks = 0
+
+    def alive(self):
+        # An idle worker never writes, so a readable connection means it died
+        return not self.conn.poll(0)
+
+    def stop(self, kill=False):
+        try:
+            if kill:
+                os.kill(self.pid, signal.SIGKILL)
+            else:
+                self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.conn.close()
+
+
+class ExtractionPool:
+    """Pre-forked worker processes that parse PDFs away from the web process.
+
+    Each call runs on one idle worker, with a wall-clock `timeout` and an RSS
+    cap (`max_rss_mb`, checked while the document is processed and again
+    after it). A worker that breaches either limit, crashes, or has served
+    `max_tasks` documents is killed and replaced, and a limit breach is
+    raised to the caller as ExtractionError. Workers are forked by a small
+    fork server (the zygote), itself forked by `start`; call `start` once the
+    PDF libraries are imported and before serving (see `warm_up`), so every
+    worker inherits them and none is forked from the threaded web process.
+    Stage timings measured in the workers are replayed into this process's
+    metrics. If the zygote itself dies it is forked again when the next
+    worker is needed (from the web process as it is by then); if no worker
+    can be started at all, calls fail at once with "unavailable".
+    """
+
+    def __init__(self, workers=2, timeout=60, max_rss_mb=512, max_tasks=200):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.max_tasks = max_tasks
+        self.recycled = {"timeout": 0, "memory": 0, "crashed": 0, "max_tasks": 0}
+        self.zygote_restarts = 0
+        self._idle = queue.Queue()
+        self._all = set()
+        self._zygote = None
+        self._zygote_conn = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Forks the zygote and the workers; `call` does it on first use otherwise."""
+        with self._lock:
+            if self._zygote is not None:
+                return
+            self._start_zygote()
+            for _ in range(self.workers):
+                self._add_worker()
+
+    def _start_zygote(self):
+        """Forks the fork server (call with the lock held)."""
+        self._zygote_conn, child_conn = multiprocessing.Pipe()
+        self._zygote = multiprocessing.get_context("fork").Process(
+            target=zygote_main, args=(child_conn, self._zygote_conn), name="extraction-zygote", daemon=True
+        )
+        self._zygote.start()
+        child_conn.close()
+
+    def _restart_zygote(self):
+        """Replaces a zygote that died (call with the lock held)."""
+        logger.warning("[WARNING] Extraction zygote died, starting a new one.")
+        self._zygote_conn.close()
+        self._zygote.join(timeout=1)
+        self._start_zygote()
+        self.zygote_restarts += 1
+
+    def _fork_worker(self):
+        """Has the zygote fork a worker on a fresh socket pair; returns the
+        Worker, or raises EOFError/OSError if the zygote is gone."""
+        conn, child_conn = multiprocessing.Pipe()
+        try:
+            reduction.send_handle(self._zygote_conn, child_conn.fileno(), self._zygote.pid)
+            return Worker(conn, self._zygote_conn.recv())
+        except BaseException:
+            conn.close()
+            raise
+        finally:
+            child_conn.close()
+
+    def _add_worker(self):
+        """Starts one more worker, restarting the zygote once if it died (call
+        with the lock held); returns False if that failed too, leaving the
+        pool one worker short."""
+        try:
+            if not self._zygote.is_alive():
+                self._restart_zygote()
+            worker = self._fork_worker()
+        except (EOFError, OSError):
+            try:
+                self._restart_zygote()
+                worker = self._fork_worker()
+            except (EOFError, OSError) as e:
+                logger.error(f"[ERROR] Could not start an extraction worker: {e}")
+                return False
+
+        self._all.add(worker)
+        self._idle.put(worker)
+        return True
+
+    def _recycle(self, worker, reason):
+        worker.stop(kill=reason != "max_tasks")
+        with self._lock:
+            self.recycled[reason] += 1
+            self._all.discard(worker)
+            if self._zygote is not None:  # Not shut down meanwhile
+                self._add_worker()
+
+    def _replenish(self):
+        """Tries to start the missing workers; raises "unavailable" at once
+        if none could be started, rather than waiting for an idle one."""
+        with self._lock:
+            if self._zygote is not None:
+                for _ in range(self.workers - len(self._all)):
+                    if not self._add_worker():
+                        break
+            if not self._all:
+                raise ExtractionError("unavailable", MESSAGES["unavailable"])
+
+    def _wait(self, worker, deadline):
+        """Waits for the worker's reply; returns the limit it breached, if any."""
+        while not worker.conn.poll(POLL_INTERVAL):
+            if time.monotonic() > deadline:
+                return "timeout"
+            rss = rss_mb(worker.pid)
+            if rss is not None and rss > self.max_rss_mb:
+                return "memory"
+        return None
+
+    def call(self, function, *args, **kwargs):
+        """Runs `function(*args, **kwargs)` in a worker and returns its result.
+
+        `function` must be importable by name (a module-level function) and
+        its arguments and result picklable. Raises ExtractionError.
+        """
+        self.start()
+        while True:
+            if not self._all:
+                self._replenish()
+            try:
+                worker = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise ExtractionError("busy", MESSAGES["busy"])
+            if worker.alive():
+                break
+            self._recycle(worker, "crashed")  # Died while idle (e.g. killed by the OOM killer)
+
+        try:
+            worker.conn.send((function, args, kwargs))
+        except (EOFError, OSError):
+            pass  # Noticed as a crash below
+        except Exception:
+            self._idle.put(worker)  # The task could not be pickled; the worker is fine
+            raise
+
+        reply = None
+        try:
+            reason = self._wait(worker, time.monotonic() + self.timeout)
+            if reason is None:
+                reply = worker.conn.recv()
+        except (EOFError, OSError):
+            reason = "crashed"
+
+        if reply is None:
+            self._recycle(worker, reason)
+            logger.warning(f"[WARNING] Extraction worker recycled ({reason}).")
+            raise ExtractionError(reason, MESSAGES[reason].format(timeout=self.timeout, max_rss_mb=self.max_rss_mb))
+
+        status, value, stages, rss = reply
+        replay_stages(stages)
+        worker.tasks += 1
+        if rss is not None and rss > self.max_rss_mb:
+            self._recycle(worker, "memory")  # Finished, but is holding on to too much memory
+        elif worker.tasks >= self.max_tasks:
+            self._recycle(worker, "max_tasks")
+        else:
+            self._idle.put(worker)
+
+        if status == "error":
+            raise ExtractionError("error", value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            stats = {"workers": len(self._all), "idle": self._idle.qsize(), "zygote_restarts": self.zygote_restarts}
+            stats.update({f"recycled_{reason}": count for reason, count in self.recycled.items()})
+        return stats
+
+    def close(self):
+        """Stops every worker; idle ones exit cleanly, busy ones are killed."""
+        with self._lock:
+            zygote, self._zygote = self._zygote, None
+            workers, self._all = self._all, set()
+        idle = set()
+        while True:
+            try:
+                idle.add(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in workers:
+            worker.stop(kill=worker not in idle)
+        if zygote is not None:
+            # Workers first: they inherit the zygote's exit sentinel, so join
+            # would otherwise wait until they were gone anyway
+            self._zygote_conn.close()  # The zygote exits on EOF
+            zygote.join(timeout=5)
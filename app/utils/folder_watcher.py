@@ -0,0 +1,124 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len; then the name
+
+# After the first event, wait this long for the rest of a bulk copy
+BATCH_WINDOW = 0.2
+
+
+def scan_pdfs(folder):
+    """`{path: (size, mtime_ns)}` for the PDFs directly in `folder`, from one
+    `os.scandir` pass (the stat comes with the directory entry)."""
+    found = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith(".pdf") and entry.is_file():
+                stat = entry.stat()
+                found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+class InotifyWatcher:
+    """Reports PDFs that were written (closed after writing) or moved into a
+    folder, through Linux inotify via ctypes. Subfolders are not watched."""
+
+    def __init__(self, folder):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.folder = folder
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {folder}")
+
+    def _read(self, paths):
+        """Adds the PDF paths of the queued events; False if the queue overflowed."""
+        complete = True
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return complete
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    complete = False
+                elif mask & IN_IGNORED:
+                    raise OSError(f"{self.folder} is no longer being watched (removed or unmounted?)")
+                elif name.lower().endswith(b".pdf"):
+                    paths.add(os.path.join(self.folder, os.fsdecode(name)))
+
+    def changes(self, timeout):
+        """Blocks up to `timeout` seconds; returns the changed PDF paths, or
+        None when events were lost and the folder must be rescanned."""
+        paths = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return paths
+        complete = self._read(paths)
+        while select.select([self.fd], [], [], BATCH_WINDOW)[0]:
+            complete = self._read(paths) and complete
+        return paths if complete else None
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback for platforms or filesystems without inotify (e.g. network
+    shares): rescans the folder every `interval` seconds. A new or changed
+    PDF is reported once its size and mtime held still for one interval, so
+    files that are still being copied are not picked up half-written."""
+
+    def __init__(self, folder, interval=5.0):
+        self.folder = folder
+        self.interval = interval
+        self._previous = scan_pdfs(folder)
+        self._reported = dict(self._previous)
+
+    def changes(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = scan_pdfs(self.folder)
+        paths = {
+            path for path, stat in current.items()
+            if stat != self._reported.get(path) and stat == self._previous.get(path)
+        }
+        for path in paths:
+            self._reported[path] = current[path]
+        for path in set(self._reported) - set(current):
+            del self._reported[path]
+        self._previous = current
+        return paths
+
+    def close(self):
+        pass
+
+
+def open_watcher(folder, poll_interval=5.0, polling=False):
+    """An InotifyWatcher for `folder`, or a PollingWatcher where inotify is
+    unavailable (or `polling` is set)."""
+    if not polling:
+        try:
+            return InotifyWatcher(folder)
+        except (OSError, AttributeError) as e:
+            print(f"[WARNING] inotify unavailable ({e}), polling {folder} every {poll_interval:g}s instead.")
+    return PollingWatcher(folder, poll_interval)
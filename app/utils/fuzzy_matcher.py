@@ -0,0 +1,137 @@
+from bisect import bisect_left
+from collections import Counter
+from difflib import SequenceMatcher
+
+DEFAULT_THRESHOLD = 85
+
+
+class FuzzyMatcher:
+    """Indexed replacement for `fuzz.partial_ratio(keyword, text) > threshold`.
+
+    `partial_ratio` slides the keyword over windows of the text picked from the
+    matching blocks of a SequenceMatcher, and rebuilds that matcher's index of
+    the whole text for every keyword. Here each section is indexed once:
+
+    * a character trigram set rejects keywords that cannot reach the
+      threshold in any window (a q-gram count bound on the similarity ratio),
+    * one SequenceMatcher over the text is reused for every keyword, so only
+      the short keyword side changes between calls,
+    * per-character position lists bound each candidate window's ratio, so only
+      plausible keyword/window pairs get the full ratio computation.
+
+    Every filter is an upper bound on the score, so the matched set is the same
+    as calling `partial_ratio` on every keyword.
+    """
+
+    def __init__(self, keywords, threshold=DEFAULT_THRESHOLD, q=3):
+        self.threshold = threshold
+        self.q = q
+        self.keywords = list(keywords)
+
+        self._grams = {}
+        self._chars = {}
+        for keyword in self.keywords:
+            self._grams[keyword] = [keyword[i:i + q] for i in range(len(keyword) - q + 1)]
+            self._chars[keyword] = Counter(keyword).items()
+
+        self._required = {}
+
+        from fuzzywuzzy import fuzz  # Imported on first use to keep startup fast
+        self._fuzz = fuzz
+
+        # With python-Levenshtein installed fuzzywuzzy scores with its own C
+        # matcher; keep the prefilter but defer scoring to fuzzywuzzy there.
+        self._batched = fuzz.SequenceMatcher is SequenceMatcher
+
+    def required_grams(self, length):
+        """Minimum number of keyword trigrams a window must share to pass the threshold.
+
+        A window `w` (at most `length` long) scores above the threshold only if
+        `2 * M > threshold / 100 * (length + len(w))`, where `M` counts matched
+        characters. Each unmatched keyword character breaks at most `q` trigrams
+        and each gap in the window at most `q - 1`, which bounds how many of the
+        keyword's trigrams must still appear verbatim in the text.
+        """
+        if length not in self._required:
+            q = self.q
+            bounds = []
+            for window in range(1, length + 1):
+                matched = (self.threshold * (length + window)) // 200 + 1
+                if matched <= window:
+                    bounds.append((length - q + 1) - q * (length - matched) - (q - 1) * (window - matched))
+            self._required[length] = min(bounds) if bounds else None
+        return self._required[length]
+
+    def _window_bound(self, keyword, positions, start, end):
+        """Upper bound (`quick_ratio`) of the keyword against `text[start:end]`."""
+        shared = 0
+        for ch, count in self._chars[keyword]:
+            indexes = positions.get(ch)
+            if indexes:
+                shared += min(count, bisect_left(indexes, end) - bisect_left(indexes, start))
+        return 2.0 * shared / (len(keyword) + end - start)
+
+    def _passes(self, ratio):
+        return ratio > .995 or int(round(100 * ratio)) > self.threshold
+
+    def match(self, text, skip=()):
+        """Returns the keywords whose `partial_ratio` against `text` exceeds the threshold.
+
+        Keywords in `skip` (typically the exact hits) are not scored.
+        """
+        matched = set()
+
+        grams = {text[i:i + self.q] for i in range(len(text) - self.q + 1)}
+        positions = {}
+        for i, ch in enumerate(text):
+            positions.setdefault(ch, []).append(i)
+
+        outer = SequenceMatcher(None, "", text)
+        inner = SequenceMatcher()
+
+        for keyword in self.keywords:
+            if keyword in skip:
+                continue
+            if keyword == text:
+                matched.add(keyword)
+                continue
+            if not keyword or not text:
+                continue
+
+            length = len(keyword)
+            if length > len(text):
+                # The text becomes the sliding side; it is short, score it directly.
+                if self._fuzz.partial_ratio(keyword, text) > self.threshold:
+                    matched.add(keyword)
+                continue
+
+            required = self.required_grams(length)
+            if required is None:
+                continue
+            if required > 0 and sum(gram in grams for gram in self._grams[keyword]) < required:
+                continue
+
+            if not self._batched:
+                if self._fuzz.partial_ratio(keyword, text) > self.threshold:
+                    matched.add(keyword)
+                continue
+
+            outer.set_seq1(keyword)
+            inner.set_seq1(keyword)
+            seen = set()
+            for block in outer.get_matching_blocks():
+                start = max(block[1] - block[0], 0)
+                if start in seen:
+                    continue
+                seen.add(start)
+
+                end = min(start + length, len(text))
+                if not self._passes(self._window_bound(keyword, positions, start, end)):
+                    continue
+
+                inner.set_seq2(text[start:end])
+                if self._passes(inner.ratio()):
+                    matched.add(keyword)
+                    break
+
+        return matched
@@ -0,0 +1,72 @@
+import os
+import sqlite3
+import threading
+import time
+
+from utils.results_store import RESULTS_DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_manifest (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    result_id INTEGER,
+    processed_at TEXT NOT NULL
+)
+"""
+
+
+class IngestManifest:
+    """Files the ingestion daemon has already handled, keyed by absolute path
+    with the size, mtime and content hash they had when processed.
+
+    Stored in the results database, so a restarted daemon only picks up what
+    is new or changed: an unchanged size and mtime skips the file outright,
+    and a touched file whose content hash still matches is not reclassified.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(SCHEMA)
+
+    def _connection(self):
+        """One connection per thread; sqlite3 connections must not be shared."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, path):
+        row = self._connection().execute("SELECT * FROM ingest_manifest WHERE path = ?", (path,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def record(self, path, size, mtime_ns, sha256, status, error=None, result_id=None):
+        """Stores the outcome for a file ("done" or "failed"), replacing any earlier one."""
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO ingest_manifest "
+                "(path, size, mtime_ns, sha256, status, error, result_id, processed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, sha256, status, error, result_id, time.strftime("%Y-%m-%d %H:%M:%S")),
+            )
+
+    def touch(self, path, size, mtime_ns):
+        """Updates the stat of a file whose content turned out to be unchanged."""
+        with self._connection() as connection:
+            connection.execute(
+                "UPDATE ingest_manifest SET size = ?, mtime_ns = ? WHERE path = ?", (size, mtime_ns, path)
+            )
+
+    def counts(self):
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM ingest_manifest GROUP BY status")
+        return {status: count for status, count in rows}
@@ -0,0 +1,94 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """Raised by `JobQueue.submit` when no more jobs can be accepted."""
+
+
+class JobQueue:
+    """Bounded background pool that runs jobs and keeps their results.
+
+    At most `max_pending` jobs may be queued or running at once; beyond that
+    `submit` raises QueueFull so callers can push back (HTTP 503) instead of
+    piling up work. Finished jobs are kept, up to `max_finished`, so their
+    results can be fetched again without re-running anything.
+
+    A job function is called as `function(report, *args)`; `report(**fields)`
+    publishes partial progress (e.g. the title) before the job finishes.
+    """
+
+    def __init__(self, workers=2, max_pending=16, max_finished=1000):
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, function, *args):
+        """Queues `function` and returns its job id, or raises QueueFull."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFull(f"{self._pending} jobs already pending")
+            self._pending += 1
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "progress": {},
+                "result": None,
+                "error": None,
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+            }
+
+        self._executor.submit(self._run, job_id, function, args)
+        return job_id
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _run(self, job_id, function, args):
+        self._update(job_id, status="running", started=time.time())
+
+        def report(**fields):
+            with self._lock:
+                self._jobs[job_id]["progress"].update(fields)
+
+        try:
+            result = function(report, *args)
+        except Exception as e:
+            print(f"[ERROR] Job {job_id} failed: {e}")
+            self._finish(job_id, status="failed", error=str(e) or type(e).__name__)
+        else:
+            self._finish(job_id, status="done", result=result)
+
+    def _finish(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields, finished=time.time())
+            self._pending -= 1
+
+            # Forget the oldest finished jobs beyond the retention limit
+            finished = len(self._jobs) - self._pending
+            for old_id in list(self._jobs):
+                if finished <= self.max_finished:
+                    break
+                if self._jobs[old_id]["finished"] is not None:
+                    del self._jobs[old_id]
+                    finished -= 1
+
+    def get(self, job_id):
+        """Returns a copy of the job record, or None for unknown/expired ids."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job, progress=dict(job["progress"])) if job else None
+
+    def stats(self):
+        with self._lock:
+            return {"pending": self._pending, "max_pending": self.max_pending, "jobs": len(self._jobs)}
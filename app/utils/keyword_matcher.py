@@ -0,0 +1,124 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton compiled from a normalized CS/IT keyword table.
+
+    The automaton is built once per keyword table over space-separated tokens
+    rather than characters, which keeps it small for tables with tens of
+    thousands of terms. Each distinct keyword token gets an integer id, and
+    the automaton steps over a section's token id array; tokens that occur in
+    no keyword map to 0 and send it straight back to the root. `find` reports
+    every keyword that occurs as a whole phrase (the same rule as
+    `f' {keyword} ' in f' {text} '`) in a single left-to-right pass, so the
+    cost no longer grows with the number of keywords.
+    """
+
+    FIELDS = ("CS", "IT")
+
+    def __init__(self, keywords):
+        self.keywords = keywords
+
+        # Keyword order per field is kept so matches are reported in the same
+        # order the old per-keyword loop appended them.
+        self.fields = {field: list(keywords.get(field, {}).items()) for field in self.FIELDS}
+        self.order = {
+            field: {keyword: i for i, (keyword, _) in enumerate(items)}
+            for field, items in self.fields.items()
+        }
+
+        # Both fields usually share one key set, so each keyword is compiled once
+        # and carries its CS and IT weights together.
+        self.weights = {}
+        for field in self.FIELDS:
+            for keyword, score in self.fields[field]:
+                cs_score, it_score = self.weights.get(keyword, (0, 0))
+                if field == "CS":
+                    cs_score = score
+                else:
+                    it_score = score
+                self.weights[keyword] = (cs_score, it_score)
+
+        self._build(list(self.weights))
+
+    def __len__(self):
+        return len(self.weights)
+
+    def _build(self, patterns):
+        """Builds the goto/fail/output tables of the automaton.
+
+        Splitting on single spaces (not `str.split()`) keeps empty tokens, so a
+        phrase matches exactly when `' {keyword} '` is a substring of `' {text} '`.
+        """
+        vocab = {}
+        goto = [{}]
+        out = [[]]
+
+        for keyword in patterns:
+            state = 0
+            for token in keyword.split(" "):
+                token = vocab.setdefault(token, len(vocab) + 1)
+                nxt = goto[state].get(token)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][token] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(keyword)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in goto[state].items():
+                queue.append(nxt)
+                back = fail[state]
+                while back and token not in goto[back]:
+                    back = fail[back]
+                fail[nxt] = goto[back].get(token, 0)
+                # Merge output links so each state lists every keyword ending there.
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self.vocab = vocab
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def token_ids(self, tokens):
+        """Maps tokens to keyword token ids, 0 for tokens no keyword contains."""
+        vocab = self.vocab
+        return [vocab.get(token, 0) for token in tokens]
+
+    def find_ids(self, ids):
+        """Returns the set of keywords whose token ids occur consecutively in `ids`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+
+        for token in ids:
+            if not token:
+                state = 0
+                continue
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if out[state]:
+                found.update(out[state])
+
+        return found
+
+    def find_tokens(self, tokens):
+        """Returns the set of keywords that occur as whole phrases in a token list."""
+        return self.find_ids(self.token_ids(tokens))
+
+    def find(self, text):
+        """Returns the set of keywords that occur as whole phrases in `text`."""
+        return self.find_tokens(text.split(" "))
+
+    def ordered(self, field, matched):
+        """Returns `(keyword, score)` pairs of `field` found in `matched`, in table order."""
+        order = self.order[field]
+        scores = self.keywords[field]
+        hits = sorted((keyword for keyword in matched if keyword in order), key=order.__getitem__)
+        return [(keyword, scores[keyword]) for keyword in hits]
@@ -0,0 +1,105 @@
+import hashlib
+import io
+import os
+import threading
+from types import MappingProxyType
+
+from utils.csv_loader import read_keywords
+from utils.fuzzy_matcher import FuzzyMatcher
+from utils.keyword_matcher import KeywordMatcher
+
+
+def normalize_keyword(text):
+    """Lowercases and removes unnecessary characters for better matching."""
+    return text.lower().replace("-", " ").strip()
+
+
+class KeywordTable:
+    """Immutable, versioned snapshot of a keyword CSV shared by all requests.
+
+    Holds the normalized CS/IT weights together with the matchers compiled from
+    them. `version` is derived from the CSV content, so two processes that load
+    the same file report the same version.
+    """
+
+    def __init__(self, path, keywords, content_hash):
+        normalized = {
+            field: MappingProxyType({normalize_keyword(k): v for k, v in keywords.get(field, {}).items()})
+            for field in ("CS", "IT")
+        }
+
+        self.path = path
+        self.content_hash = content_hash
+        self.version = content_hash[:12]
+        self.keywords = MappingProxyType(normalized)
+        self.matcher = KeywordMatcher(self.keywords)
+        self.fuzzy_matcher = FuzzyMatcher(self.matcher.weights)
+
+    def __len__(self):
+        return len(self.matcher)
+
+    def __setattr__(self, name, value):
+        if name in self.__dict__:
+            raise AttributeError(f"KeywordTable is immutable; cannot reassign {name!r}")
+        super().__setattr__(name, value)
+
+    @classmethod
+    def from_bytes(cls, path, data):
+        """Parses raw CSV bytes into a table versioned by their SHA-256."""
+        keywords = read_keywords(io.StringIO(data.decode("utf-8")))
+        return cls(path, keywords, hashlib.sha256(data).hexdigest())
+
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def get_keyword_table(csv_path):
+    """Returns the process-wide KeywordTable for `csv_path`.
+
+    The file is only re-read when its mtime or size changes, and a new table is
+    only built when the content hash differs from the one already loaded, so
+    requests normally pay a single `os.stat`.
+    """
+    path = os.path.abspath(csv_path)
+
+    try:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = None
+
+    cached = _tables.get(path)
+    if cached is not None and (cached[0] == stamp or stamp is None):
+        return cached[1]
+
+    with _lock:
+        cached = _tables.get(path)
+        if cached is not None and (cached[0] == stamp or stamp is None):
+            return cached[1]
+
+        if stamp is None:
+            print(f"❌ [ERROR] CSV file not found: {csv_path}")
+            table = KeywordTable(path, {"CS": {}, "IT": {}}, hashlib.sha256(b"").hexdigest())
+        else:
+            with open(path, "rb") as file:
+                data = file.read()
+            digest = hashlib.sha256(data).hexdigest()
+
+            if cached is not None and cached[1].content_hash == digest:
+                # Touched but unchanged: keep the compiled table
+                table = cached[1]
+            else:
+                try:
+                    table = KeywordTable.from_bytes(path, data)
+                except Exception as e:
+                    if cached is None:
+                        raise
+                    # Keep serving the last good table rather than failing requests
+                    print(f"❌ [ERROR] Failed to reload {csv_path}, keeping {cached[1].version}: {e}")
+                    table = cached[1]
+                else:
+                    print(f"🔹 Loaded keyword table {table.version} ({len(table)} keywords) from {csv_path}")
+
+        _tables[path] = (stamp, table)
+        return table
@@ -0,0 +1,146 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels, in Prometheus terms."""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_labels(key)} {format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with optional labels."""
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((key, list(series)) for key, series in self._series.items())
+
+        for key, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{format_labels(key)} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("classifier_stage_seconds", "Time spent in each pipeline stage.")
+STAGE_ERRORS = Counter("classifier_stage_errors_total", "Pipeline stages that raised an exception.")
+DOCUMENTS = Counter("classifier_documents_total", "Processed documents by outcome (CS, IT or failed).")
+
+REGISTRY = [STAGE_SECONDS, STAGE_ERRORS, DOCUMENTS]
+
+_capture = threading.local()
+
+
+def record_stage(stage, seconds, failed=False):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if failed:
+        STAGE_ERRORS.inc(stage=stage)
+    observations = getattr(_capture, "observations", None)
+    if observations is not None:
+        observations.append((stage, seconds, failed))
+
+
+@contextmanager
+def capture_stages():
+    """Collects the `(stage, seconds, failed)` observations made in the block,
+    so a worker process can send them back to be replayed with `replay_stages`
+    where /metrics is served."""
+    observations = _capture.observations = []
+    try:
+        yield observations
+    finally:
+        _capture.observations = None
+
+
+def replay_stages(observations):
+    for stage, seconds, failed in observations:
+        record_stage(stage, seconds, failed)
+
+
+@contextmanager
+def timed(stage):
+    """Records the duration of the enclosed block under `stage`, and counts
+    the block as an error for that stage if it raises."""
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - start, failed)
+
+
+def observe_stage(stage, seconds):
+    """Records a duration measured by the caller (e.g. summed over sections)."""
+    record_stage(stage, seconds)
+
+
+def render_metrics(gauges=None):
+    """All registered metrics in the Prometheus text exposition format.
+
+    `gauges` maps extra metric names to `{labels tuple: value}` for values
+    owned elsewhere, such as cache sizes.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for name, values in (gauges or {}).items():
+        lines.append(f"# TYPE {name} gauge")
+        for key, value in values.items():
+            lines.append(f"{name}{format_labels(key)} {format_value(value)}")
+    return "\n".join(lines) + "\n"
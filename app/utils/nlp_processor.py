@@ -1,56 +1,142 @@
+import os
 import re
-from fuzzywuzzy import fuzz
-import nltk
-import warnings
-
-
-try:
-    with warnings.catch_warnings():  
-        warnings.simplefilter("ignore")
-        nltk.data.find('tokenizers/punkt')
-except LookupError:
-    import ssl
-    try:
-        _create_unverified_https_context = ssl._create_unverified_context
-    except AttributeError:
-        pass
-    else:
-        ssl._create_default_https_context = _create_unverified_https_context
-    
-    nltk.download('punkt', quiet=True)
-
-def classify_text(extracted_sections, keywords):
-    """Classifies text using robust but discreet preprocessing"""
-    
-    if not isinstance(extracted_sections, dict):
-        print("[ERROR] Expected a dictionary for extracted sections.")
-        return {}, 0, 0, {}
+import threading
+import time
+from functools import partial
+from utils.keyword_matcher import KeywordMatcher
+from utils.fuzzy_matcher import FuzzyMatcher
+from utils.metrics import observe_stage
+from utils.tokenizer import word_tokenize as treebank_word_tokenize
+
+# Tokenizer data is looked up here first (then in NLTK's usual locations) and is
+# never downloaded at runtime. To vendor it for offline nodes:
+#     python -m nltk.downloader -d app/nltk_data punkt_tab
+NLTK_DATA_DIR = os.environ.get(
+    "NLTK_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nltk_data")
+)
+
+_word_tokenize = None
+_tokenizer_lock = threading.Lock()
+
+
+def untokenized(text):
+    return text.split(" ")
+
+
+def get_word_tokenizer():
+    """Returns the word tokenizer, importing NLTK on first use.
+
+    Sentences are split with NLTK's punkt model and each sentence is tokenized
+    by `utils.tokenizer`, which produces the same tokens as `nltk.word_tokenize`
+    in a fraction of the time. If the punkt_tab data is missing the text is left
+    untokenized (split on spaces only), which is what `word_tokenize` failing
+    used to fall back to, rather than reaching out to the network for it.
+    """
+    global _word_tokenize
+    if _word_tokenize is not None:
+        return _word_tokenize
+
+    with _tokenizer_lock:
+        if _word_tokenize is None:
+            import nltk
+
+            if NLTK_DATA_DIR not in nltk.data.path:
+                nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+            # Build the model `nltk.sent_tokenize` would use, so a node without
+            # it (e.g. with only the legacy pickled `tokenizers/punkt`, which
+            # NLTK no longer reads) is caught here and not on every section.
+            try:
+                from nltk.tokenize import PunktTokenizer
+
+                sentences = PunktTokenizer("english").tokenize
+            except (ImportError, LookupError):
+                print(f"[WARNING] NLTK punkt_tab data not found in {NLTK_DATA_DIR} or the NLTK data path; "
+                      "sections will not be tokenized.")
+                _word_tokenize = untokenized
+            else:
+                _word_tokenize = partial(treebank_word_tokenize, sentences=sentences)
+
+    return _word_tokenize
+
+def tokenizer_name():
+    """Names the active tokenizer; sections tokenized differently can match
+    different keywords, so cached results must not be shared across them."""
+    return "untokenized" if get_word_tokenizer() is untokenized else "punkt-treebank"
+
+def match_sections(extracted_sections, matcher, fuzzy_matcher):
+    """Returns `{section: set of matched keywords}`, exact and fuzzy hits together.
+
+    Keywords are reported once per section even when they appear in both
+    fields; `matcher.ordered` turns a set back into per-field score lists.
+    """
+    word_tokenize = get_word_tokenizer()
 
     # Discreet text normalization (looks like simple string ops)
     def normalize_text(text):
         text = text.lower().replace('-', ' ').replace('_', ' ')
         try:
-            return ' '.join(nltk.word_tokenize(text))  # Hidden tokenization
-        except:
-            return text  # Fallback to original if tokenization fails
+            return word_tokenize(text)  # Hidden tokenization
+        except Exception:
+            return untokenized(text)  # Fallback to original if tokenization fails
 
-    processed_sections = {sec: normalize_text(text) for sec, text in extracted_sections.items()}
-    
-    # Rest remains identical to your original code
-    section_scores = {sec: {"CS": 0, "IT": 0} for sec in processed_sections}
-    extracted_keywords = {sec: [] for sec in processed_sections}
+    # Each section is tokenized once: the token id array drives the exact
+    # matcher and the space-joined tokens the fuzzy one.
+    start = time.perf_counter()
+    section_tokens = {sec: normalize_text(text) for sec, text in extracted_sections.items()}
+    processed_sections = {sec: ' '.join(tokens) for sec, tokens in section_tokens.items()}
+    observe_stage("tokenization", time.perf_counter() - start)
 
+    matched_sections = {}
+    exact_time = fuzzy_time = 0.0
     for section, section_text in processed_sections.items():
+        # One pass finds every exact hit for both fields at once
+        start = time.perf_counter()
+        matched = matcher.find_ids(matcher.token_ids(section_tokens[section]))
+        exact_time += time.perf_counter() - start
+
+        # Keywords that missed the exact match fall back to fuzzy matching,
+        # scored once even when the keyword appears in both fields
+        start = time.perf_counter()
+        matched |= fuzzy_matcher.match(section_text, skip=matched)
+        fuzzy_time += time.perf_counter() - start
+
+        matched_sections[section] = matched
+
+    # Per document, summed over its sections
+    observe_stage("exact_match", exact_time)
+    observe_stage("fuzzy_match", fuzzy_time)
+
+    return matched_sections
+
+def classify_text(extracted_sections, keywords, fuzzy_matcher=None):
+    """Classifies text using robust but discreet preprocessing.
+
+    `keywords` is either the normalized `{"CS": {...}, "IT": {...}}` table or a
+    `KeywordMatcher` compiled from it, and `fuzzy_matcher` a `FuzzyMatcher` over
+    the same keywords; passing the compiled matchers avoids rebuilding them.
+    """
+
+    if not isinstance(extracted_sections, dict):
+        print("[ERROR] Expected a dictionary for extracted sections.")
+        return {}, 0, 0, {}
+
+    matcher = keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords)
+    if fuzzy_matcher is None:
+        fuzzy_matcher = FuzzyMatcher(matcher.weights)
+
+    matched_sections = match_sections(extracted_sections, matcher, fuzzy_matcher)
+
+    section_scores = {sec: {"CS": 0, "IT": 0} for sec in matched_sections}
+    extracted_keywords = {sec: [] for sec in matched_sections}
+
+    for section, matched in matched_sections.items():
         for field in ["CS", "IT"]:
-            for keyword, score in keywords[field].items():
-                if f' {keyword} ' in f' {section_text} ':
-                    section_scores[section][field] += score
-                    extracted_keywords[section].append(keyword)
-                elif fuzz.partial_ratio(keyword, section_text) > 85:
-                    section_scores[section][field] += score
-                    extracted_keywords[section].append(keyword)
+            for keyword, score in matcher.ordered(field, matched):
+                section_scores[section][field] += score
+                extracted_keywords[section].append(keyword)
 
     cs_total = sum(scores["CS"] for scores in section_scores.values())
     it_total = sum(scores["IT"] for scores in section_scores.values())
 
-    return section_scores, cs_total, it_total, extracted_keywords
\ No newline at end of file
+    return section_scores, cs_total, it_total, extracted_keywords
@@ -1,7 +1,14 @@
+import io
 import re
 import os
-import PyPDF2
-import fitz  # PyMuPDF (for better extraction)
+from bisect import bisect_left
+# PyMuPDF (fitz, for better extraction) and PyPDF2 are imported on first use,
+# so importing this module stays cheap for workers that may never parse a PDF.
+from utils.metrics import timed
+
+# Bump whenever extraction or section detection changes output, so cached
+# extractions from older code are not reused.
+EXTRACTOR_VERSION = "2"
 
 def get_latest_pdf(upload_folder):
     """Find the most recently uploaded PDF file."""
@@ -12,30 +19,87 @@ def get_latest_pdf(upload_folder):
     latest_file = max(pdf_files, key=lambda f: os.path.getmtime(os.path.join(upload_folder, f)))
     return os.path.join(upload_folder, latest_file)
 
-def extract_text_from_pdf(pdf_path):
-    """Extracts text from a PDF using PyMuPDF (fallback to PyPDF2 if needed)."""
+def open_pdf(source):
+    """Opens a PDF given its path or its bytes (uploads are parsed in memory)."""
+    import fitz
+
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+def iter_doc_pages(doc):
+    """Yields the text of each page of an open PyMuPDF document lazily."""
+    for page in doc:
+        yield page.get_text("text") + "\n"
+
+def iter_pdf_pages(pdf_path):
+    """Yields the text of each page lazily; the document is closed as soon as the
+    generator is exhausted or closed. `pdf_path` may also be the PDF's bytes."""
+    with open_pdf(pdf_path) as doc:
+        yield from iter_doc_pages(doc)
+
+def iter_pdf_pages_pypdf2(pdf_path):
+    """Page generator over PyPDF2, used when PyMuPDF finds no text."""
+    import PyPDF2
+
+    if isinstance(pdf_path, (bytes, bytearray)):
+        file = io.BytesIO(pdf_path)
+    else:
+        file = open(pdf_path, "rb")
+    with file:
+        reader = PyPDF2.PdfReader(file)
+        for page in reader.pages:
+            page_text = page.extract_text()
+            if page_text:
+                yield page_text + "\n"
+
+def read_pages(pages, streaming=False, max_pages=None, need_title=True):
+    """Concatenates page text, stopping early once all sections are closed
+    (streaming mode) or after `max_pages` pages."""
     text = ""
-    
+    try:
+        for number, page_text in enumerate(pages, 1):
+            text += page_text
+            if max_pages and number >= max_pages:
+                break
+            if streaming and sections_complete(text, need_title):
+                break
+    finally:
+        pages.close()  # Release the document handle right away
+    return text
+
+def extract_text_from_pdf(pdf_path, streaming=False, max_pages=None):
+    """Extracts text from a PDF using PyMuPDF (fallback to PyPDF2 if needed).
+
+    The title is taken from the typography of the first pages (see
+    `extract_title_from_layout`) before the body is read. With `streaming=True`
+    pages are read lazily and reading stops as soon as the Introduction,
+    Objectives and Scope and Limitations sections have all been closed by a
+    terminating heading (and the title, if the layout did not yield one).
+    `max_pages` caps the number of pages read in either mode. `pdf_path` may
+    also be the PDF's bytes, which are parsed without touching the disk.
+    """
     try:
         # First try using PyMuPDF (more reliable for all PDFs)
-        doc = fitz.open(pdf_path)
-        for page in doc:
-            text += page.get_text("text") + "\n"
-        
+        with timed("pdf_open"):
+            doc = open_pdf(pdf_path)
+        with doc:
+            with timed("title_layout"):
+                title = extract_title_from_layout(doc)
+            with timed("text_extraction"):
+                text = read_pages(iter_doc_pages(doc), streaming, max_pages, need_title=not title)
+
         # If PyMuPDF fails, fallback to PyPDF2
         if not text.strip():
-            with open(pdf_path, "rb") as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+            with timed("text_extraction_pypdf2"):
+                text += read_pages(iter_pdf_pages_pypdf2(pdf_path), streaming, max_pages, need_title=not title)
 
     except Exception as e:
         print(f"[ERROR] Failed to extract text: {e}")
         return {}
 
-    return extract_text_sections(text)
+    with timed("segmentation"):
+        return extract_text_sections(text, title)
 
 def clean_text(text):
     """Cleans and normalizes extracted text."""
@@ -43,54 +107,343 @@ def clean_text(text):
     text = text.replace("- ", "")  # Merge words split by hyphens
     return text.strip()
 
-def extract_title(pdf_text):
-    """Extracts the research paper title, ensuring it stops at the Introduction or Abstract."""
-    university_header = [
-        "Republic of the Philippines",
-        "CAVITE STATE UNIVERSITY",
-        "Don Severino de las Alas Campus",
-        "Indang, Cavite"
-        
-    ]
-
-    lines = pdf_text.split("\n")
-    
-    # 1️⃣ Detect University Block
-    title_detected = False
-    title_index = -1
-    for i in range(len(lines) - len(university_header)):
-        if all(university_header[j] in lines[i + j] for j in range(len(university_header))):
-            title_detected = True
-            title_index = i + len(university_header)
+UNIVERSITY_HEADER = [
+    "Republic of the Philippines",
+    "CAVITE STATE UNIVERSITY",
+    "Don Severino de las Alas Campus",
+    "Indang, Cavite"
+]
+
+TITLE_STOP_PATTERN = re.compile(
+    r'^(Introduction|Rationale|Abstract|Table of Contents|Chapter|Significance of the Study)', re.IGNORECASE
+)
+
+# Every heading the section detection knows about. Where one heading is a
+# prefix of another ("Objectives" / "Objectives of the Study") the longer one
+# is listed first, mirroring the alternation order of the original regexes.
+HEADINGS = [
+    "Objectives of the Study",
+    "General Objective",
+    "Specific Objectives",
+    "Objectives",
+    " O b j e c t i v e s",
+    "Introduction",
+    "Rationale",
+    "Background",
+    "Scope and Limitations",
+    "Significance of the Study",
+    "Expected Output",
+    "References",
+]
+
+# section -> (headings that open it, headings that close it)
+SECTION_HEADINGS = {
+    "introduction": (
+        {"Introduction", "Rationale", "Background"},
+        {"Significance of the Study", "Scope and Limitations", "Objectives of the Study", "Expected Output", "References"},
+    ),
+    "objectives": (
+        {"Objectives of the Study", "General Objective", "Specific Objectives", "Objectives", " O b j e c t i v e s"},
+        {"Scope and Limitations", "Significance of the Study", "Expected Output", "References"},
+    ),
+    "scope": (
+        {"Scope and Limitations"},
+        {"Significance of the Study", "Objectives of the Study", "Expected Output", "References"},
+    ),
+}
+
+HEADING_SCANNER = re.compile(
+    "|".join(f"({re.escape(heading)})" for heading in HEADINGS),
+    re.IGNORECASE
+)
+
+# Whitespace and an optional colon allowed between the Objectives heading and its text
+OBJECTIVES_LEAD = re.compile(r"\s*[:\n]?")
+
+SCOPE_HEADING = re.compile(r"Scope\s+and\s+Limitations", re.IGNORECASE)
+
+# A terminator starting this close to the end of partially read text might still change
+# once the next page is appended (e.g. a hyphenated word merged across pages).
+STREAM_MARGIN = 32
+
+LOWER_HEADINGS = [heading.lower() for heading in HEADINGS]
+
+# Characters re.IGNORECASE matches against ASCII letters that str.lower() does
+# not turn into them (İ, ı, ſ); text containing them takes the regex path.
+CASEFOLD_MISMATCH = "\u0130\u0131\u017f"
+
+def find_headings(cleaned):
+    """Returns `(start, end, heading)` for every heading occurrence, by offset.
+
+    Headings are located with C-level substring search over a lowercased copy,
+    which is equivalent to the case-insensitive regexes whenever lowercasing
+    keeps offsets and case folding agrees; otherwise one regex scan is used.
+    Overlapping headings are all reported (e.g. the "Objectives of the Study"
+    inside "Specific Objectives of the Study"); when several start at the same
+    offset, the one listed first in HEADINGS wins, as in regex alternation.
+    """
+    lowered = cleaned.lower()
+    found = []
+
+    if len(lowered) == len(cleaned) and not any(ch in cleaned for ch in CASEFOLD_MISMATCH):
+        for index, heading in enumerate(LOWER_HEADINGS):
+            position = lowered.find(heading)
+            while position != -1:
+                found.append((position, index))
+                position = lowered.find(heading, position + 1)
+        found.sort()
+    else:
+        match = HEADING_SCANNER.search(cleaned)
+        while match:
+            found.append((match.start(), match.lastindex - 1))
+            match = HEADING_SCANNER.search(cleaned, match.start() + 1)
+
+    headings = []
+    for position, index in found:
+        if not headings or headings[-1][0] != position:
+            headings.append((position, position + len(HEADINGS[index]), HEADINGS[index]))
+    return headings
+
+def segment_sections(cleaned):
+    """Slices the sections out of cleaned text using the heading offsets.
+
+    Returns `{section: (start, end, closed)}` for each section whose opening
+    heading was found; `closed` tells whether a terminating heading (rather than
+    the end of the text) ended it. The first opening heading wins and the
+    section runs to the first terminating heading at or after its text, exactly
+    like the lazy `(.*?)(?=\s*(...|$))` searches this replaces.
+    """
+    headings = find_headings(cleaned)
+    starts = [heading[0] for heading in headings]
+    spans = {}
+
+    for section, (openers, terminators) in SECTION_HEADINGS.items():
+        opener = next((heading for heading in headings if heading[2] in openers), None)
+        if opener is None:
+            continue
+
+        start = opener[1]
+        if section == "objectives":
+            start = OBJECTIVES_LEAD.match(cleaned, start).end()
+
+        end, closed = len(cleaned), False
+        for i in range(bisect_left(starts, start), len(headings)):
+            if headings[i][2] in terminators:
+                end, closed = headings[i][0], True
+                break
+
+        spans[section] = (start, end, closed)
+
+    return spans
+
+def iter_lines(text, start=0):
+    """Yields the lines of `text` from offset `start` without splitting the rest."""
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+def find_title_lines(pdf_text):
+    """Returns `(title_lines, header_found, closed)` for the university title block."""
+    # 1️⃣ Detect University Block: jump straight to lines holding the first header line
+    header_size = len(UNIVERSITY_HEADER)
+    position = pdf_text.find(UNIVERSITY_HEADER[0])
+    title_start = -1
+    while position != -1:
+        line_start = pdf_text.rfind("\n", 0, position) + 1
+        block = pdf_text[line_start:].split("\n", header_size)
+        if len(block) <= header_size:
+            break  # Too close to the end for the block plus one more line
+        if all(UNIVERSITY_HEADER[j] in block[j] for j in range(header_size)):
+            title_start = line_start + sum(len(line) + 1 for line in block[:header_size])
             break
+        position = pdf_text.find(UNIVERSITY_HEADER[0], line_start + len(block[0]) + 1)
+
+    if title_start < 0:
+        return [], False, False
 
     # 2️⃣ Extract Multi-line Title
     extracted_title = []
-    if title_detected:
-        for i in range(title_index, len(lines)):
-            line = lines[i].strip()
+    for line in iter_lines(pdf_text, title_start):
+        line = line.strip()
 
-            # Stop if we reach Introduction, Abstract, or Table of Contents
-            if re.match(r'^(Introduction|Rationale|Abstract|Table of Contents|Chapter|Significance of the Study)', line, re.IGNORECASE):
-                break
-            
-            # Ignore empty lines or page numbers
-            if line and not re.match(r'^\d+$', line):
-                extracted_title.append(line)
+        # Stop if we reach Introduction, Abstract, or Table of Contents
+        if TITLE_STOP_PATTERN.match(line):
+            return extracted_title, True, True
+
+        # Ignore empty lines or page numbers
+        if line and not re.match(r'^\d+$', line):
+            extracted_title.append(line)
+
+    return extracted_title, True, False
+
+def extract_title(pdf_text):
+    """Extracts the research paper title, ensuring it stops at the Introduction or Abstract."""
+    extracted_title, _, _ = find_title_lines(pdf_text)
 
     # 3️⃣ Join Multi-line Title into a Single String
     final_title = " ".join(extracted_title).strip()
 
     return final_title if final_title else "Title Not Found"
 
-def extract_text_sections(pdf_text):
-    """Extracts Title, Introduction, Objectives, and Scope sections reliably."""
+# Span flag PyMuPDF sets on bold text
+BOLD_FLAG = 16
+
+# Pages searched for the title block
+TITLE_PAGES = 2
+
+# "Proposed Thesis Title : ..." style labels, e.g. on self-assessment cover sheets
+TITLE_LABEL = re.compile(r'^(?:Proposed\s+)?(?:(?:Thesis|Research|Study)\s+)?Title\s*:\s*(.+)', re.IGNORECASE)
+
+# Any "Area of Study :" style label line, which ends a labelled title
+FIELD_LABEL = re.compile(r'^[A-Za-z][A-Za-z ]{0,40}:')
+
+LOWER_UNIVERSITY_HEADER = [line.lower() for line in UNIVERSITY_HEADER]
+
+def iter_layout_lines(doc, max_pages=TITLE_PAGES):
+    """Yields `(page, y, x, text, bold, size)` for each text line of the first
+    pages, in reading order. PyMuPDF can emit blocks out of order (page
+    numbers often come first), so lines are sorted by position per page."""
+    import fitz
+
+    for number, page in enumerate(doc):
+        if number >= max_pages:
+            return
+        lines = []
+        for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+            for line in block.get("lines", []):
+                spans = [span for span in line["spans"] if span["text"].strip()]
+                if not spans:
+                    continue
+                text = re.sub(r'\s+', ' ', " ".join(span["text"].strip() for span in spans))
+                bold = all(span["flags"] & BOLD_FLAG or "bold" in span["font"].lower() for span in spans)
+                size = max(span["size"] for span in spans)
+                lines.append((number, line["bbox"][1], line["bbox"][0], text, bold, size))
+        lines.sort()
+        yield from lines
+
+def is_header_line(text):
+    """True for lines that are essentially one of the university header lines
+    (titles such as "... in Indang, Cavite" merely contain one)."""
+    lowered = text.lower()
+    return any(header in lowered and len(lowered) <= len(header) + 8 for header in LOWER_UNIVERSITY_HEADER)
+
+def extract_title_from_pdf(pdf_path, max_pages=TITLE_PAGES):
+    """Reads only the first pages of a PDF for its title, so it can be shown
+    before the rest of the document is processed. Accepts a path or bytes."""
+    try:
+        with open_pdf(pdf_path) as doc:
+            return extract_title_from_layout(doc, max_pages) or "Title Not Found"
+    except Exception as e:
+        print(f"[ERROR] Failed to read title: {e}")
+        return "Title Not Found"
+
+def take_block(lines, first, match):
+    """The run of lines from index `first` that `match(previous, line)` accepts."""
+    block = [lines[first]]
+    for line in lines[first + 1:]:
+        if not match(block[-1], line):
+            break
+        block.append(line)
+    return block
+
+def same_block(previous, line):
+    """Same page, same font size and no more than a blank line or two apart."""
+    return (line[0] == previous[0] and abs(line[5] - previous[5]) < 0.5
+            and line[1] - previous[1] < 3 * line[5])
+
+def extract_title_from_layout(doc, max_pages=TITLE_PAGES):
+    """Finds the title from font metadata on the first pages of an open document.
+
+    A "Title :" label wins when present. Otherwise the title is the first run
+    of bold lines of one size after the university header (or the first run of
+    largest-font lines when nothing is bold), stopping at Introduction,
+    Abstract and the like. Returns "" when no candidate is found.
+    """
+    lines = []
+    for line in iter_layout_lines(doc, max_pages):
+        text = line[3]
+        if TITLE_STOP_PATTERN.match(text):
+            break
+        # Ignore page numbers, and the header lines above the title
+        if re.match(r'^\d+$', text) or (not lines and is_header_line(text)):
+            continue
+        lines.append(line)
+
+    if not lines:
+        return ""
+
+    block = None
+    for i, line in enumerate(lines):
+        label = TITLE_LABEL.match(line[3])
+        if label:
+            block = take_block(lines, i, lambda previous, line: (
+                line[0] == previous[0] and abs(line[2] - previous[2]) < 1 and not FIELD_LABEL.match(line[3])
+            ))
+            block[0] = block[0][:3] + (label.group(1),) + block[0][4:]
+            break
+
+    if block is None:
+        first = next((i for i, line in enumerate(lines) if line[4]), None)
+        if first is not None:
+            block = take_block(lines, first, lambda previous, line: line[4] and same_block(previous, line))
+        else:
+            largest = max(line[5] for line in lines)
+            first = next(i for i, line in enumerate(lines) if line[5] == largest)
+            block = take_block(lines, first, same_block)
+
+    return " ".join(line[3] for line in block).strip()
+
+def sections_complete(pdf_text, need_title=True):
+    """True once more pages can no longer change the extracted sections.
+
+    Each of Introduction, Objectives and Scope and Limitations must have been
+    closed by one of its terminating headings (not by end of text), and, when
+    `need_title` is set, the title block must be closed too. If the university
+    header has not shown up by then the title is treated as absent rather than
+    reading on for it.
+    """
+    # Cheap gate: nothing can be complete before the Scope heading shows up
+    if not SCOPE_HEADING.search(pdf_text):
+        return False
+
+    cleaned = clean_text(pdf_text)
+    spans = segment_sections(cleaned)
+    limit = len(cleaned) - STREAM_MARGIN
+    for section in SECTION_HEADINGS:
+        if section not in spans:
+            return False
+        _, end, closed = spans[section]
+        if not closed or end > limit:
+            return False
+
+    if not need_title:
+        return True
+
+    _, header_found, title_closed = find_title_lines(pdf_text)
+    return title_closed or not header_found
+
+NOT_FOUND = {
+    "introduction": "Introduction Not Found",
+    "objectives": "Objectives Not Found",
+    "scope": "Scope and Limitations Not Found",
+}
+
+def extract_text_sections(pdf_text, title=None):
+    """Extracts Title, Introduction, Objectives, and Scope sections reliably.
+
+    A `title` already found from the page layout is used as is; otherwise the
+    title is searched for below the university header in the text.
+    """
     if not isinstance(pdf_text, str):  
         print("[ERROR] Expected a string input for section extraction.")
         return {"title": "", "introduction": "", "objectives": "", "scope": ""}
 
     sections = {
-        "title": extract_title(pdf_text),
+        "title": title or extract_title(pdf_text),
         "introduction": "",
         "objectives": "",
         "scope": ""
@@ -98,30 +451,15 @@ def extract_text_sections(pdf_text):
     
     pdf_text = clean_text(pdf_text)  # Clean the text before processing
 
-    # Extract Introduction
-    intro_match = re.search(
-        r"(?:Introduction|Rationale|Background)(.*?)(?=\s*(Significance of the Study|Scope and Limitations|Objectives of the Study|Expected Output|References|$))", 
-        pdf_text, re.IGNORECASE | re.DOTALL
-    )
-    
-    # Extract Objectives
-    # Extract Objectives (More Flexible Matching)
-    obj_match = re.search(
-        r"(?:Objectives of the Study|General Objective|Specific Objectives|Objectives| O b j e c t i v e s)\s*[:\n]?(.*?)(?=\s*(Scope and Limitations|Significance of the Study|Expected Output|References|$))",
-        pdf_text, re.IGNORECASE | re.DOTALL
-    )
-
-  
-    # Extract Scope and Limitations
-    scope_match = re.search(
-        r"Scope and Limitations(.*?)(?=\s*(Significance of the Study|Objectives of the Study|Expected Output|References|$))", 
-        pdf_text, re.IGNORECASE | re.DOTALL
-    )
-
-    # Store extracted sections after cleaning them
-    sections["introduction"] = clean_text(intro_match.group(1)) if intro_match else "Introduction Not Found"
-    sections["objectives"] = clean_text(obj_match.group(1)) if obj_match else "Objectives Not Found"
-    sections["scope"] = clean_text(scope_match.group(1)) if scope_match else "Scope and Limitations Not Found"
+    # One pass over the headings, then slice each section out. The slices come
+    # from already cleaned text, so stripping is all the cleaning they need.
+    spans = segment_sections(pdf_text)
+    for section, missing in NOT_FOUND.items():
+        if section in spans:
+            start, end, _ = spans[section]
+            sections[section] = pdf_text[start:end].strip()
+        else:
+            sections[section] = missing
 
     return sections
 
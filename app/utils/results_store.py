@@ -0,0 +1,139 @@
+import csv
+import io
+import os
+import sqlite3
+import threading
+import time
+
+RESULTS_DB_PATH = os.environ.get("RESULTS_DB_PATH", "app/results/results.db")
+
+SECTIONS = ["title", "introduction", "objectives", "scope"]
+
+# One row per classification, in export column order
+RESULT_COLUMNS = (
+    ["file", "title"]
+    + [f"cs_{section}" for section in SECTIONS]
+    + [f"it_{section}" for section in SECTIONS]
+    + ["cs_total", "it_total", "decision", "general_keywords", "interpretation",
+       "enhancement_suggestion", "keyword_version", "selected_course"]
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    {", ".join(f"{column} {'REAL' if column.startswith(('cs_', 'it_')) else 'TEXT'}" for column in RESULT_COLUMNS)}
+)
+"""
+
+
+def result_row(title, cs_scores, it_scores, cs_total, it_total, general_keywords,
+               interpretation, enhancement_suggestion, keyword_version):
+    """Flattens the values `process_pdf` returns into one result row."""
+    row = {
+        "title": title,
+        "cs_total": round(float(cs_total), 2),
+        "it_total": round(float(it_total), 2),
+        "decision": "CS" if cs_total > it_total else "IT",
+        "general_keywords": ", ".join(general_keywords),
+        "interpretation": interpretation,
+        "enhancement_suggestion": enhancement_suggestion,
+        "keyword_version": keyword_version,
+    }
+    for section in SECTIONS:
+        row[f"cs_{section}"] = round(float(cs_scores.get(section, 0)), 2)
+        row[f"it_{section}"] = round(float(it_scores.get(section, 0)), 2)
+    return row
+
+
+class ResultsStore:
+    """Append-only SQLite log of classification results.
+
+    The database runs in WAL mode, so appends from concurrent requests (or
+    processes) never rewrite earlier history and readers never block writers:
+    saving a result is one INSERT regardless of how many rows exist. Reports
+    are generated on demand with `export`.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(SCHEMA)
+
+    def _connection(self):
+        """One connection per thread; sqlite3 connections must not be shared."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def append(self, row):
+        """Stores one result row (see RESULT_COLUMNS) and returns its id."""
+        values = [row.get(column) for column in RESULT_COLUMNS]
+        with self._connection() as connection:
+            cursor = connection.execute(
+                f"INSERT INTO results (created_at, {', '.join(RESULT_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' * len(RESULT_COLUMNS))})",
+                [time.strftime("%Y-%m-%d %H:%M:%S")] + values,
+            )
+        return cursor.lastrowid
+
+    def iter_rows(self, limit=None):
+        """Yields stored rows as dicts, oldest first (the last `limit` rows if given)."""
+        query = "SELECT * FROM results ORDER BY id"
+        params = ()
+        if limit:
+            query = f"SELECT * FROM ({query} DESC LIMIT ?) ORDER BY id"
+            params = (limit,)
+        for row in self._connection().execute(query, params):
+            yield dict(row)
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def iter_csv(self, limit=None):
+        """Yields the export as CSV text, a row at a time, for streaming responses."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        columns = ["id", "created_at"] + RESULT_COLUMNS
+        writer.writerow(columns)
+        for row in self.iter_rows(limit):
+            writer.writerow([row[column] for column in columns])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    def export_xlsx(self, output, limit=None):
+        """Writes the results as an Excel workbook to a path or binary file object."""
+        import pandas as pd
+
+        columns = ["id", "created_at"] + RESULT_COLUMNS
+        df = pd.DataFrame(list(self.iter_rows(limit)), columns=columns)
+
+        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+            df.to_excel(writer, index=False, sheet_name="Results")
+            worksheet = writer.sheets["Results"]
+            worksheet.set_column(0, len(columns) - 1, 18)
+            worksheet.set_column(columns.index("title"), columns.index("title"), 50)
+            worksheet.freeze_panes(1, 0)
+
+
+_store = None
+_lock = threading.Lock()
+
+
+def get_results_store():
+    """Returns the process-wide results store, creating the database on first use."""
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = ResultsStore(RESULTS_DB_PATH)
+    return _store
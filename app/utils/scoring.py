@@ -0,0 +1,102 @@
+SECTION_ORDER = ["title", "introduction", "objectives", "scope"]
+
+# Raw keyword points per section are scaled onto 25 and capped there, so each
+# of the four sections contributes at most a quarter of the 100-point total.
+SECTION_WEIGHTS = {
+    "title": 25 / 50,
+    "introduction": 25 / 250,
+    "objectives": 25 / 250,
+    "scope": 25 / 250,
+}
+MAX_SECTION_SCORE = 25
+
+# Interpretation bands by the winning total: Full, Strong, Moderate, Basic and
+# Minimal alignment; below the last cutoff the result needs a human expert.
+ALIGNMENT_CUTOFFS = (90, 80, 70, 60, 50)
+# A section scoring below the first value (totals in the Moderate band or
+# above) or the second (weaker totals) is listed as needing enhancement.
+LOW_SECTION_SCORES = (18, 20)
+
+FIELDS = ("CS", "IT")
+
+
+def weighted_scores(section_scores, field):
+    """Weighted, capped score per section for `field` from `classify_text`'s raw section scores."""
+    return {
+        section: min(section_scores.get(section, {}).get(field, 0) * weight, MAX_SECTION_SCORE)
+        for section, weight in SECTION_WEIGHTS.items()
+    }
+
+
+def decide(cs_total, it_total):
+    return "CS" if cs_total > it_total else "IT"
+
+
+def weighted_totals(raw, weights, cap=MAX_SECTION_SCORE):
+    """Vectorized `weighted_scores` plus totals, shared by `score_corpus` and
+    the grid search in evaluate.py.
+
+    `raw` holds raw points with the last two axes (sections in SECTION_ORDER,
+    fields in FIELDS); `weights` broadcasts against `raw`'s shape without the
+    fields axis, and `cap` against it without sections and fields. Returns
+    the weighted, capped `scores` (shaped like `raw`) and the `totals` per
+    field, summed section by section in the same order as the per-document
+    path so the floats come out identical.
+    """
+    import numpy as np
+
+    scores = np.minimum(raw * np.asarray(weights)[..., None], np.asarray(cap)[..., None, None])
+    totals = scores[..., 0, :].copy()
+    for j in range(1, len(SECTION_ORDER)):
+        totals += scores[..., j, :]
+    return scores, totals
+
+
+def score_corpus(documents, matcher):
+    """Scores many documents at once from their matched keywords.
+
+    `documents` is a list of `{section: set of matched keywords}` (what
+    `match_sections` returns) and `matcher` the KeywordMatcher they were
+    matched with. The matched keywords become a sparse (documents x sections)
+    by keywords 0/1 matrix; one product with the CS/IT weight vectors gives
+    every raw section score, and the weighting, capping, totals and decision
+    are array operations over the whole corpus. The results equal what
+    `classify_text` plus `weighted_scores` give one document at a time.
+
+    Returns a dict of NumPy arrays: "cs_scores" and "it_scores" (one row per
+    document, columns in SECTION_ORDER), "cs_total", "it_total" and "decision".
+    """
+    import numpy as np
+    from scipy import sparse
+
+    keywords = list(matcher.weights)
+    column = {keyword: i for i, keyword in enumerate(keywords)}
+    field_weights = np.array(
+        [[matcher.keywords.get(field, {}).get(keyword, 0) for field in FIELDS] for keyword in keywords],
+        dtype=np.float64,
+    ).reshape(len(keywords), len(FIELDS))
+
+    rows, columns = [], []
+    for i, matched_sections in enumerate(documents):
+        for j, section in enumerate(SECTION_ORDER):
+            for keyword in matched_sections.get(section, ()):
+                if keyword in column:
+                    rows.append(i * len(SECTION_ORDER) + j)
+                    columns.append(column[keyword])
+
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)),
+        shape=(len(documents) * len(SECTION_ORDER), len(keywords)),
+    )
+    # Raw points per (document, section, field); integer sums, exact in float64
+    raw = (counts @ field_weights).reshape(len(documents), len(SECTION_ORDER), len(FIELDS))
+
+    scores, totals = weighted_totals(raw, [SECTION_WEIGHTS[section] for section in SECTION_ORDER])
+
+    return {
+        "cs_scores": scores[:, :, 0],
+        "it_scores": scores[:, :, 1],
+        "cs_total": totals[:, 0],
+        "it_total": totals[:, 1],
+        "decision": np.where(totals[:, 0] > totals[:, 1], "CS", "IT"),
+    }
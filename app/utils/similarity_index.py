@@ -0,0 +1,228 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from utils.results_store import RESULTS_DB_PATH
+
+SECTIONS = ["title", "introduction", "objectives", "scope"]
+
+# 128 MinHash values split into 32 LSH bands of 4: two proposals share a
+# bucket (become candidates) with probability 1 - (1 - s^4)^32 for Jaccard
+# similarity s, i.e. ~50% at s = 0.42 and over 99% from s = 0.65 up.
+NUM_PERMUTATIONS = 128
+BANDS = 32
+ROWS = NUM_PERMUTATIONS // BANDS
+SHINGLE_WORDS = 3
+
+# Matches below this estimated Jaccard similarity are not reported
+SIMILARITY_THRESHOLD = float(os.environ.get("SIMILARITY_THRESHOLD", "0.5"))
+SIMILARITY_TOP_K = int(os.environ.get("SIMILARITY_TOP_K", "5"))
+
+# Fixed seed: signatures stored by one process must be comparable in any other
+_SEED = 20240611
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS minhash (
+    id INTEGER PRIMARY KEY,
+    file TEXT,
+    title TEXT,
+    created_at TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    digest TEXT
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    bucket INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lsh_buckets_bucket ON lsh_buckets (bucket);
+"""
+
+# One entry per distinct PDF (SHA-256 of its bytes); created after MIGRATIONS
+INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS minhash_digest ON minhash (digest);
+"""
+
+# Columns added since the first release, for databases created before them
+MIGRATIONS = [("digest", "ALTER TABLE minhash ADD COLUMN digest TEXT")]
+
+_WORD = re.compile(r"\w+")
+_permutations = None
+
+
+def shingles(sections):
+    """32-bit hashes of the word 3-grams in the extracted sections (lowercased,
+    punctuation dropped), as a set. Short texts give one shingle of all words."""
+    words = []
+    for section in SECTIONS:
+        words.extend(_WORD.findall((sections.get(section) or "").lower()))
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def permutations():
+    """The (a, b) coefficients of the NUM_PERMUTATIONS hash functions."""
+    global _permutations
+    if _permutations is None:
+        import numpy as np
+
+        rng = np.random.default_rng(_SEED)
+        a = rng.integers(1, 2 ** 63, size=NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+        b = rng.integers(0, 2 ** 63, size=NUM_PERMUTATIONS, dtype=np.uint64)
+        _permutations = (a, b)
+    return _permutations
+
+
+def minhash(shingle_hashes):
+    """MinHash signature (NUM_PERMUTATIONS uint32 values) of a set of shingle
+    hashes, or None for an empty set.
+
+    Each hash function is multiply-shift, (a * x + b) mod 2^64 keeping the top
+    32 bits, evaluated for every shingle and permutation at once.
+    """
+    if not shingle_hashes:
+        return None
+    import numpy as np
+
+    a, b = permutations()
+    values = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes))
+    hashed = (values[:, None] * a[None, :] + b[None, :]) >> np.uint64(32)
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def signature_of(sections):
+    return minhash(shingles(sections))
+
+
+def band_buckets(signature):
+    """One bucket id per band; equal ids mean the band's rows are identical."""
+    data = signature.astype("<u4").tobytes()
+    width = ROWS * 4
+    buckets = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(band.to_bytes(2, "big") + data[band * width:(band + 1) * width], digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "big", signed=True))  # Fits SQLite's INTEGER
+    return buckets
+
+
+def estimated_similarity(signature, other):
+    """Estimated Jaccard similarity: the fraction of equal MinHash values."""
+    return float((signature == other).mean())
+
+
+class SimilarityIndex:
+    """MinHash signatures of classified proposals with an LSH bucket index,
+    stored in the results database.
+
+    A lookup reads only the proposals that share at least one band bucket
+    with the query, so its cost grows with the number of near matches rather
+    than with the archive. Their similarity is then estimated from the stored
+    signatures.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(minhash)")}
+            for column, statement in MIGRATIONS:
+                if column not in columns:
+                    connection.execute(statement)
+            connection.executescript(INDEXES)
+
+    def _connection(self):
+        """One connection per thread; sqlite3 connections must not be shared."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def add(self, signature, file=None, title=None, digest=None, connection=None):
+        """Stores a signature and its band buckets; returns the entry's id.
+
+        `digest` is the SHA-256 of the PDF's bytes: a PDF that is already
+        indexed is not stored again, and the earlier entry's id is returned.
+        """
+        if connection is None:
+            with self._connection() as connection:
+                return self.add(signature, file, title, digest, connection)
+
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO minhash (file, title, created_at, signature, digest) VALUES (?, ?, ?, ?, ?)",
+            (file, title, time.strftime("%Y-%m-%d %H:%M:%S"), signature.astype("<u4").tobytes(), digest),
+        )
+        if not cursor.rowcount:
+            return connection.execute("SELECT id FROM minhash WHERE digest = ?", (digest,)).fetchone()[0]
+        doc_id = cursor.lastrowid
+        connection.executemany(
+            "INSERT INTO lsh_buckets (bucket, doc_id) VALUES (?, ?)",
+            [(bucket, doc_id) for bucket in band_buckets(signature)],
+        )
+        return doc_id
+
+    def query(self, signature, k=SIMILARITY_TOP_K, threshold=SIMILARITY_THRESHOLD, digest=None):
+        """The `k` stored proposals most similar to `signature`, best first, as
+        dicts with id, file, title, created_at and similarity. An entry for
+        the same PDF bytes (`digest`) is left out, so a resubmission does not
+        match its own earlier copy."""
+        import numpy as np
+
+        buckets = band_buckets(signature)
+        rows = self._connection().execute(
+            "SELECT id, file, title, created_at, signature, digest FROM minhash WHERE id IN "
+            f"(SELECT doc_id FROM lsh_buckets WHERE bucket IN ({', '.join('?' * len(buckets))}))",
+            buckets,
+        ).fetchall()
+
+        matches = []
+        for row in rows:
+            if digest is not None and row["digest"] == digest:
+                continue
+            similarity = estimated_similarity(signature, np.frombuffer(row["signature"], dtype="<u4"))
+            if similarity >= threshold:
+                match = {key: row[key] for key in ("id", "file", "title", "created_at")}
+                match["similarity"] = round(similarity, 3)
+                matches.append(match)
+        matches.sort(key=lambda match: (-match["similarity"], match["id"]))
+        return matches[:k]
+
+    def rebuild(self, entries):
+        """Replaces the whole index with `entries`, an iterable of
+        `(signature, file, title, digest)`, in one transaction; returns the
+        number of distinct PDFs indexed."""
+        with self._connection() as connection:
+            connection.execute("DELETE FROM lsh_buckets")
+            connection.execute("DELETE FROM minhash")
+            for signature, file, title, digest in entries:
+                self.add(signature, file, title, digest, connection=connection)
+        return self.count()
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM minhash").fetchone()[0]
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def get_similarity_index():
+    """Returns the process-wide similarity index, creating its tables on first use."""
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = SimilarityIndex(RESULTS_DB_PATH)
+    return _index
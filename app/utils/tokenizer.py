@@ -0,0 +1,98 @@
+import re
+
+# Port of NLTK's NLTKWordTokenizer (the word tokenizer behind `nltk.word_tokenize`):
+# the same substitutions, in the same order. Each rule carries the characters
+# (or lowercase substrings) it cannot match without, and a rule is skipped
+# when none of them occur in the text. Most rules are no-ops on a typical
+# section, so the usual cost is a handful of regex passes instead of thirty,
+# and the tokens are identical to NLTK's.
+
+QUOTE_CHARS = "«“‘„`"
+CLOSING = r"\]\)}>\"\'»”’ "
+
+# (pattern, replacement, trigger characters)
+STARTING_QUOTES = [
+    (re.compile("([«“‘„]|[`]+)", re.U), r" \1 ", QUOTE_CHARS),
+    (re.compile(r"^\""), r"``", '"'),
+    (re.compile(r"(``)"), r" \1 ", "`"),
+    (re.compile(r"([ \(\[{<])(\"|\'{2})"), r"\1 `` ", "\"'"),
+    (re.compile(r"(?i)(?<!\w)(\')(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)", re.U), r"\1 ", "'"),
+]
+
+PUNCTUATION = [
+    (re.compile(r"([^\.])(\.)([" + CLOSING + r"]*)\s*$", re.U), r"\1 \2 \3 ", "."),
+    (re.compile(r"([:,])([^\d])"), r" \1 \2", ":,"),
+    (re.compile(r"([:,])$"), r" \1 ", ":,"),
+    (re.compile(r"\.{2,}", re.U), r" \g<0> ", "."),
+    (re.compile(r"[;@#$%&]"), r" \g<0> ", ";@#$%&"),
+    (re.compile("[\u2012-\u2015]", re.U), r" \g<0> ", "\u2012\u2013\u2014\u2015"),
+    (re.compile(r'([^\.])(\.)([\]\)}>"\']*)\s*$'), r"\1 \2\3 ", "."),
+    (re.compile(r"[?!]"), r" \g<0> ", "?!"),
+    (re.compile(r"([^'])' "), r"\1 ' ", "'"),
+    (re.compile(r"[*]", re.U), r" \g<0> ", "*"),
+    (re.compile(r"[\]\[\(\)\{\}\<\>]"), r" \g<0> ", "[](){}<>"),
+    (re.compile(r"--"), r" -- ", "-"),
+]
+
+ENDING_QUOTES = [
+    (re.compile("([»”’])", re.U), r" \1 ", "»”’"),
+    (re.compile(r"''"), " '' ", "'"),
+    (re.compile(r'"'), " '' ", '"'),
+    (re.compile(r"\s+"), " ", None),
+    (re.compile(r"([^' ])('[sS]|'[mM]|'[dD]|') "), r"\1 \2 ", "'"),
+    (re.compile(r"([^' ])('ll|'LL|'re|'RE|'ve|'VE|n't|N'T) "), r"\1 \2 ", "'"),
+]
+
+# MacIntyre contractions, triggered by lowercase substrings
+CONTRACTIONS = [
+    (re.compile(r"(?i)\b(can)(?#X)(not)\b"), "cannot"),
+    (re.compile(r"(?i)\b(d)(?#X)('ye)\b"), "d'ye"),
+    (re.compile(r"(?i)\b(gim)(?#X)(me)\b"), "gimme"),
+    (re.compile(r"(?i)\b(gon)(?#X)(na)\b"), "gonna"),
+    (re.compile(r"(?i)\b(got)(?#X)(ta)\b"), "gotta"),
+    (re.compile(r"(?i)\b(lem)(?#X)(me)\b"), "lemme"),
+    (re.compile(r"(?i)\b(more)(?#X)('n)\b"), "more'n"),
+    (re.compile(r"(?i)\b(wan)(?#X)(na)(?=\s)"), "wanna"),
+    (re.compile(r"(?i) ('t)(?#X)(is)\b"), "'tis"),
+    (re.compile(r"(?i) ('t)(?#X)(was)\b"), "'twas"),
+]
+
+
+# Characters re.IGNORECASE matches against ASCII letters that str.lower() does
+# not turn into them; text holding one runs every contraction rule.
+CASEFOLD_MISMATCH = "\u0130\u0131\u017f\u212a"
+
+
+def apply_rules(text, rules, chars):
+    for pattern, replacement, triggers in rules:
+        if triggers is None or not chars.isdisjoint(triggers):
+            text = pattern.sub(replacement, text)
+    return text
+
+
+def treebank_tokenize(text):
+    """Splits one sentence into tokens exactly like NLTK's NLTKWordTokenizer."""
+    chars = set(text)
+    if '"' in chars:
+        chars.update("`'")  # The quote rules rewrite " into `` and ''
+
+    text = apply_rules(text, STARTING_QUOTES, chars)
+    text = apply_rules(text, PUNCTUATION, chars)
+    text = apply_rules(" " + text + " ", ENDING_QUOTES, chars)
+
+    lowered = text.lower()
+    every = not chars.isdisjoint(CASEFOLD_MISMATCH)
+    for pattern, trigger in CONTRACTIONS:
+        if every or trigger in lowered:
+            text = pattern.sub(r" \1 \2 ", text)
+
+    return text.split()
+
+
+def word_tokenize(text, sentences=None):
+    """`nltk.word_tokenize` equivalent: `sentences` splits the text into
+    sentences first (e.g. `nltk.sent_tokenize`); without it the whole text is
+    tokenized as one line, like `preserve_line=True`."""
+    if sentences is None:
+        return treebank_tokenize(text)
+    return [token for sentence in sentences(text) for token in treebank_tokenize(sentence)]
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+# Uploads up to this size are classified straight from memory; larger ones are
+# spooled to a temporary file so a few big PDFs cannot exhaust the heap.
+UPLOAD_SPOOL_BYTES = int(os.environ.get("UPLOAD_SPOOL_BYTES", 4 * 1024 * 1024))
+
+# ARCHIVE_UPLOADS=1 keeps a copy of every upload in ARCHIVE_FOLDER, written
+# after the response has been sent.
+ARCHIVE_UPLOADS = os.environ.get("ARCHIVE_UPLOADS", "0") != "0"
+ARCHIVE_FOLDER = os.environ.get("ARCHIVE_FOLDER", "uploads/archive")
+
+
+class Upload:
+    """One uploaded PDF, held as bytes or (above the spool threshold) in a
+    private temporary file.
+
+    `source` is what the PDF functions accept: the bytes or the temp file path.
+    Each upload owns its data, so two uploads with the same filename never
+    touch each other. Call `close` (or `release_upload`) when done with it.
+    """
+
+    def __init__(self, filename, data=None, path=None):
+        self.filename = filename
+        self.data = data
+        self.path = path
+
+    @classmethod
+    def receive(cls, file, spool_bytes=UPLOAD_SPOOL_BYTES):
+        """Reads a Werkzeug FileStorage into memory, or into a temp file when
+        it is larger than `spool_bytes`."""
+        filename = os.path.basename(file.filename or "")
+        data = file.stream.read(spool_bytes + 1)
+        if len(data) <= spool_bytes:
+            return cls(filename, data=data)
+
+        fd, path = tempfile.mkstemp(prefix="upload_", suffix=".pdf")
+        with os.fdopen(fd, "wb") as spool:
+            spool.write(data)
+            shutil.copyfileobj(file.stream, spool)
+        return cls(filename, path=path)
+
+    @property
+    def source(self):
+        return self.data if self.data is not None else self.path
+
+    def archive(self, folder=ARCHIVE_FOLDER):
+        """Stores a copy under a unique name in `folder` and returns its path."""
+        os.makedirs(folder, exist_ok=True)
+        target = os.path.join(folder, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}-{self.filename}")
+        if self.data is not None:
+            with open(target, "wb") as file:
+                file.write(self.data)
+        else:
+            shutil.copyfile(self.path, target)
+        return target
+
+    def close(self):
+        """Frees the bytes or deletes the temp file."""
+        self.data = None
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+
+def release_upload(upload, archive=None):
+    """Archives the upload if enabled, then frees it. Meant to run once the
+    response is out (response close callbacks, job and future completion)."""
+    try:
+        if ARCHIVE_UPLOADS if archive is None else archive:
+            upload.archive()
+    except OSError as e:
+        print(f"[ERROR] Failed to archive {upload.filename}: {e}")
+    finally:
+        upload.close()
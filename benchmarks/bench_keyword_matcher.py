@@ -0,0 +1,110 @@
+"""Compares the compiled keyword matcher against the old per-keyword scan.
+
+Run from the repository root:
+
+    python benchmarks/bench_keyword_matcher.py --sizes 843 5000 20000 50000
+
+The keyword table from `dataset/keywords2.csv` is padded with synthetic terms
+up to each size, and both strategies are timed on the extracted sections of
+the PDFs in `uploads/`. Exact-match results are checked for equality.
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from utils.csv_loader import load_keywords
+from utils.keyword_matcher import KeywordMatcher
+
+CSV_PATH = "dataset/keywords2.csv"
+UPLOAD_FOLDER = "uploads"
+
+
+def normalize_text(text):
+    return text.lower().replace("-", " ").strip()
+
+
+def load_table(csv_path):
+    with redirect_stdout(io.StringIO()):
+        keywords = load_keywords(csv_path)
+    return {field: {normalize_text(k): v for k, v in keywords[field].items()} for field in ("CS", "IT")}
+
+
+def grow_table(table, size, seed=0):
+    """Pads the table with synthetic multi-word terms built from its own vocabulary."""
+    rng = random.Random(seed)
+    vocabulary = sorted({word for keyword in table["CS"] for word in keyword.split()})
+    grown = {field: dict(scores) for field, scores in table.items()}
+
+    while len(grown["CS"]) < size:
+        keyword = " ".join(rng.sample(vocabulary, rng.randint(2, 4)))
+        cs_score, it_score = rng.choice([(20, 10), (10, 20), (10, 10)])
+        grown["CS"].setdefault(keyword, cs_score)
+        grown["IT"].setdefault(keyword, it_score)
+
+    return grown
+
+
+def load_sections(folder, limit):
+    from utils.pdf_analyzer import extract_text_from_pdf
+
+    texts = []
+    for name in sorted(os.listdir(folder))[:limit]:
+        if name.endswith(".pdf"):
+            with redirect_stdout(io.StringIO()):
+                sections = extract_text_from_pdf(os.path.join(folder, name))
+            texts.extend(text.lower().replace("-", " ").replace("_", " ") for text in sections.values())
+    return texts
+
+
+def naive_scan(table, text):
+    """The exact-match loop `classify_text` used before the matcher existed."""
+    found = set()
+    for field in ("CS", "IT"):
+        for keyword in table[field]:
+            if f" {keyword} " in f" {text} ":
+                found.add(keyword)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[843, 5000, 20000, 50000])
+    parser.add_argument("--docs", type=int, default=10, help="Number of PDFs from uploads/ to use")
+    args = parser.parse_args()
+
+    base = load_table(CSV_PATH)
+    texts = load_sections(UPLOAD_FOLDER, args.docs)
+    total_chars = sum(len(text) for text in texts)
+    print(f"{len(texts)} sections, {total_chars} characters\n")
+    print(f"{'keywords':>9} {'build (s)':>10} {'matcher (s)':>12} {'naive (s)':>10} {'speedup':>8}")
+
+    for size in args.sizes:
+        table = grow_table(base, size)
+
+        start = time.perf_counter()
+        matcher = KeywordMatcher(table)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        compiled = [matcher.find(text) for text in texts]
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        naive = [naive_scan(table, text) for text in texts]
+        reference = time.perf_counter() - start
+
+        if compiled != naive:
+            print(f"[ERROR] Matcher results differ from the naive scan at {size} keywords.")
+            sys.exit(1)
+
+        print(f"{len(matcher):>9} {build:>10.3f} {scan:>12.3f} {reference:>10.3f} {reference / scan:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Worst-case timing and parity check for the single-pass heading segmenter.
+
+Run from the repository root:
+
+    python benchmarks/bench_segmenter.py --sizes 10000 100000 1000000
+
+Adversarial documents (opening headings with no terminating heading, near-miss
+terminators, walls of repeated headings) are segmented at growing sizes. The
+run fails if segmentation time stops growing linearly or exceeds the budget.
+Every PDF in uploads/ is also checked against the previous three-regex
+implementation, which is kept below for reference.
+"""
+import argparse
+import io
+import os
+import re
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from utils.pdf_analyzer import clean_text, extract_text_sections, iter_pdf_pages
+
+UPLOAD_FOLDER = "uploads"
+
+LEGACY_PATTERNS = {
+    "introduction": re.compile(
+        r"(?:Introduction|Rationale|Background)(.*?)(?=\s*(Significance of the Study|Scope and Limitations|Objectives of the Study|Expected Output|References|$))",
+        re.IGNORECASE | re.DOTALL
+    ),
+    "objectives": re.compile(
+        r"(?:Objectives of the Study|General Objective|Specific Objectives|Objectives| O b j e c t i v e s)\s*[:\n]?(.*?)(?=\s*(Scope and Limitations|Significance of the Study|Expected Output|References|$))",
+        re.IGNORECASE | re.DOTALL
+    ),
+    "scope": re.compile(
+        r"Scope and Limitations(.*?)(?=\s*(Significance of the Study|Objectives of the Study|Expected Output|References|$))",
+        re.IGNORECASE | re.DOTALL
+    ),
+}
+
+LEGACY_NOT_FOUND = {
+    "introduction": "Introduction Not Found",
+    "objectives": "Objectives Not Found",
+    "scope": "Scope and Limitations Not Found",
+}
+
+
+def legacy_sections(pdf_text):
+    """The lazy DOTALL regex searches extract_text_sections used before the segmenter."""
+    cleaned = clean_text(pdf_text)
+    sections = {}
+    for section, pattern in LEGACY_PATTERNS.items():
+        match = pattern.search(cleaned)
+        sections[section] = clean_text(match.group(1)) if match else LEGACY_NOT_FOUND[section]
+    return sections
+
+
+def adversarial_documents(size):
+    """Inputs with no (or almost no) terminating headings, about `size` characters each."""
+    filler = "the proposed system uses machine learning to classify data "
+    return {
+        "opener, no terminator": "Introduction " + filler * (size // len(filler)),
+        "every opener, no terminator": "Introduction Objectives Scope and Limitations " + filler * (size // len(filler)),
+        "repeated openers": "Background Objectives Rationale " * (size // 32),
+        "near-miss terminators": "Introduction " + "Scope and Limitation Significance of the Stud Reference " * (size // 56),
+        "hyphen and space noise": "Objectives - " + "a-  b -  \n\n  c  " * (size // 16),
+    }
+
+
+def time_call(function, text, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_corpus(folder):
+    mismatches = 0
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".pdf"):
+            continue
+        text = "".join(iter_pdf_pages(os.path.join(folder, name)))
+        with redirect_stdout(io.StringIO()):
+            current = extract_text_sections(text)
+        expected = legacy_sections(text)
+        if any(current[section] != expected[section] for section in expected):
+            mismatches += 1
+            print(f"[MISMATCH] {name}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--budget", type=float, default=2.0, help="Max seconds per document at the largest size")
+    parser.add_argument("--skip-legacy", action="store_true", help="Do not time the old regexes")
+    parser.add_argument("--folder", default=UPLOAD_FOLDER)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'input':<28} {'chars':>9} {'segmenter (s)':>14} {'legacy (s)':>11}")
+
+    for label in adversarial_documents(1):
+        per_char = []
+        for size in args.sizes:
+            text = adversarial_documents(size)[label]
+            elapsed = time_call(extract_text_sections, text)
+            per_char.append(elapsed / len(text))
+            legacy = "-" if args.skip_legacy else f"{time_call(legacy_sections, text, repeat=1):.4f}"
+            print(f"{label:<28} {len(text):>9} {elapsed:>14.4f} {legacy:>11}")
+
+            if size == args.sizes[-1] and elapsed > args.budget:
+                failures.append(f"{label}: {elapsed:.2f}s over the {args.budget}s budget")
+
+        # Linear scaling: cost per character at the largest size stays within 4x of the smallest
+        if per_char[-1] > 4 * per_char[0] and per_char[-1] * args.sizes[-1] > 0.05:
+            failures.append(f"{label}: cost per character grew {per_char[-1] / per_char[0]:.1f}x")
+
+    if os.path.isdir(args.folder):
+        mismatches = check_corpus(args.folder)
+        if mismatches:
+            failures.append(f"{mismatches} PDF(s) differ from the legacy regexes")
+        else:
+            print(f"\n✅ Segmenter output matches the legacy regexes on {args.folder}/")
+
+    if failures:
+        for failure in failures:
+            print(f"[ERROR] {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Cold-start benchmark for the Flask app, with enforced budgets.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py --runs 5 --import-budget 1.0 --first-request-budget 1.5
+
+Each run starts a fresh interpreter and measures:
+
+* import: `import main` (the app module and everything it pulls in),
+* first request: import plus the first `GET /` through the test client,
+* first classification: import plus `process_pdf` on one PDF, which pays for
+  the lazily imported PDF/NLP libraries and the keyword table build.
+
+The run fails if the median import or first-request time exceeds its budget,
+or if any heavy dependency is imported by `import main` itself.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Must only be imported when first needed, never by `import main`
+HEAVY_MODULES = ["pandas", "sklearn", "scipy", "nltk", "fitz", "pymupdf", "PyPDF2", "fuzzywuzzy", "tabulate"]
+
+PROBE = """
+import io, json, os, sys, time
+from contextlib import redirect_stdout
+start = time.perf_counter()
+sys.path.insert(0, "app")
+with redirect_stdout(io.StringIO()):
+    import main
+imported = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+with redirect_stdout(io.StringIO()):
+    main.app.test_client().get("/")
+first_request = time.perf_counter() - start
+classified = None
+if {pdf!r}:
+    with redirect_stdout(io.StringIO()):
+        main.process_pdf(os.path.basename({pdf!r}), upload_folder=os.path.dirname({pdf!r}), save_results=False)
+    classified = time.perf_counter() - start
+print(json.dumps({{"import": imported, "first_request": first_request, "first_classification": classified, "heavy": heavy}}))
+"""
+
+
+def run_probe(pdf_path):
+    # A fresh extraction cache per run, so the first classification really parses the PDF
+    cache_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES, pdf=pdf_path)],
+            cwd=ROOT, env=dict(os.environ, EXTRACTION_CACHE_DIR=cache_dir),
+            capture_output=True, text=True, check=True,
+        ).stdout
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=1.0, help="Max median seconds for `import main`")
+    parser.add_argument("--first-request-budget", type=float, default=1.5, help="Max median seconds to the first GET /")
+    parser.add_argument("--pdf", default=None, help="PDF for the first-classification timing (default: first in uploads/)")
+    args = parser.parse_args()
+
+    pdf_path = args.pdf
+    if pdf_path is None:
+        names = sorted(name for name in os.listdir(os.path.join(ROOT, "uploads")) if name.endswith(".pdf"))
+        pdf_path = os.path.join("uploads", names[0]) if names else ""
+
+    runs = [run_probe(pdf_path) for _ in range(args.runs)]
+    failures = []
+
+    print(f"{'stage':<22} {'median (s)':>11} {'min (s)':>9} {'max (s)':>9}")
+    for stage in ["import", "first_request", "first_classification"]:
+        values = [run[stage] for run in runs if run[stage] is not None]
+        if values:
+            print(f"{stage:<22} {statistics.median(values):>11.3f} {min(values):>9.3f} {max(values):>9.3f}")
+
+    for stage, budget in [("import", args.import_budget), ("first_request", args.first_request_budget)]:
+        median = statistics.median(run[stage] for run in runs)
+        if median > budget:
+            failures.append(f"{stage} took {median:.3f}s, over the {budget}s budget")
+
+    heavy = sorted({name for run in runs for name in run["heavy"]})
+    if heavy:
+        failures.append(f"`import main` eagerly imports {', '.join(heavy)}")
+
+    if failures:
+        for failure in failures:
+            print(f"[ERROR] {failure}")
+        sys.exit(1)
+    print("\n✅ Startup is within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Parity and timing check for the compiled word tokenizer against NLTK.
+
+Run from the repository root:
+
+    python benchmarks/bench_tokenizer.py --repeat 5
+
+Every section extracted from the PDFs in uploads/ is normalized the way
+`classify_text` does it and tokenized both by NLTK's NLTKWordTokenizer (the
+tokenizer behind `nltk.word_tokenize`) and by `utils.tokenizer`, sentence by
+sentence. Sentences are split with `nltk.sent_tokenize` when the punkt data is
+installed and with an untrained punkt model otherwise, so the check runs on
+offline machines too. The run fails on any token difference.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import nltk
+from nltk.tokenize import NLTKWordTokenizer
+from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+from utils.nlp_processor import NLTK_DATA_DIR, get_word_tokenizer, tokenizer_name
+from utils.pdf_analyzer import extract_text_sections, iter_pdf_pages
+from utils.tokenizer import treebank_tokenize, word_tokenize
+
+UPLOAD_FOLDER = "uploads"
+
+# Inputs that exercise the rarer rules (quotes, contractions, dashes, ellipses)
+EDGE_CASES = [
+    'He said, "it\'s done." Then: \'maybe\'...',
+    "“Smart” systems can't -- and won't -- cannot gonna wanna 'tis 'twas d'ye gimme.",
+    "Costs rose 5% (from $1,000 to $1,050) & fell; why? (a) [b] {c} <d>",
+    "The system’s users — students, faculty – and the ‘admin’ «panel».",
+    "e.g. the end.'\" ",
+    "``quoted'' text, 3:45, a:b, trailing,",
+]
+
+
+def section_texts(folder):
+    texts = []
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".pdf"):
+            continue
+        with redirect_stdout(io.StringIO()):
+            sections = extract_text_sections("".join(iter_pdf_pages(os.path.join(folder, name))))
+        for text in sections.values():
+            texts.append(text.lower().replace("-", " ").replace("_", " "))
+    return texts
+
+
+def sentence_splitter():
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    try:
+        nltk.data.find("tokenizers/punkt_tab/english/")
+        return nltk.sent_tokenize, "punkt"
+    except LookupError:
+        return PunktSentenceTokenizer().tokenize, "untrained punkt (punkt data not installed)"
+
+
+def time_call(function, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--folder", default=UPLOAD_FOLDER)
+    args = parser.parse_args()
+
+    # The tokenizer classify_text actually uses must load and be callable
+    active = get_word_tokenizer()
+    if not callable(active):
+        print(f"[ERROR] get_word_tokenizer() returned {active!r}, not a tokenizer")
+        sys.exit(1)
+    print(f"🔹 Active tokenizer: {tokenizer_name()}")
+
+    texts = section_texts(args.folder) + EDGE_CASES
+    sentences, splitter = sentence_splitter()
+    reference = NLTKWordTokenizer()
+
+    def nltk_tokenize(text):
+        return [token for sentence in sentences(text) for token in reference.tokenize(sentence)]
+
+    def compiled_tokenize(text):
+        return word_tokenize(text, sentences)
+
+    mismatches = 0
+    for text in texts:
+        # Whole text as one line (preserve_line=True) and sentence by sentence
+        if treebank_tokenize(text) != reference.tokenize(text) or compiled_tokenize(text) != nltk_tokenize(text):
+            mismatches += 1
+            print(f"[MISMATCH] {text[:80]!r}")
+
+    chars = sum(len(text) for text in texts)
+    print(f"{len(texts)} sections, {chars} characters, sentences split with {splitter}\n")
+    print(f"{'tokenizer':<26} {'best of ' + str(args.repeat) + ' (s)':>16} {'chars/sec':>12}")
+    for label, function in [
+        ("nltk (per sentence)", nltk_tokenize),
+        ("compiled (per sentence)", compiled_tokenize),
+        ("nltk (one line)", reference.tokenize),
+        ("compiled (one line)", treebank_tokenize),
+    ]:
+        elapsed = time_call(function, texts, args.repeat)
+        print(f"{label:<26} {elapsed:>16.4f} {chars / elapsed:>12.0f}")
+
+    if mismatches:
+        print(f"[ERROR] {mismatches} section(s) tokenize differently from NLTK")
+        sys.exit(1)
+    print("\n✅ Compiled tokenizer output matches NLTK on every section.")
+
+
+if __name__ == "__main__":
+    main()
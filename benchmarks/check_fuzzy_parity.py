@@ -0,0 +1,73 @@
+"""Checks FuzzyMatcher against fuzzywuzzy's partial_ratio on the uploads/ corpus.
+
+Run from the repository root:
+
+    python benchmarks/check_fuzzy_parity.py --thresholds 80 85 90
+
+For every section of every PDF, the set of keywords with
+`fuzz.partial_ratio(keyword, section) > threshold` must equal the set that
+FuzzyMatcher reports. Exits non-zero on any difference.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from fuzzywuzzy import fuzz
+from utils.fuzzy_matcher import FuzzyMatcher
+from utils.pdf_analyzer import extract_text_from_pdf
+from bench_keyword_matcher import CSV_PATH, UPLOAD_FOLDER, load_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default=UPLOAD_FOLDER)
+    parser.add_argument("--thresholds", type=int, nargs="+", default=[85])
+    parser.add_argument("--docs", type=int, default=None, help="Limit the number of PDFs checked")
+    args = parser.parse_args()
+
+    keywords = list(load_table(CSV_PATH)["CS"])
+    names = sorted(name for name in os.listdir(args.folder) if name.endswith(".pdf"))[:args.docs]
+
+    texts = []
+    for name in names:
+        with redirect_stdout(io.StringIO()):
+            sections = extract_text_from_pdf(os.path.join(args.folder, name))
+        for section, text in sections.items():
+            texts.append((name, section, text.lower().replace("-", " ").replace("_", " ")))
+
+    failures = 0
+    for threshold in args.thresholds:
+        matcher = FuzzyMatcher(keywords, threshold=threshold)
+        reference_time = indexed_time = 0.0
+
+        for name, section, text in texts:
+            start = time.perf_counter()
+            expected = {keyword for keyword in keywords if fuzz.partial_ratio(keyword, text) > threshold}
+            reference_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = matcher.match(text)
+            indexed_time += time.perf_counter() - start
+
+            if expected != actual:
+                failures += 1
+                print(f"[MISMATCH] {name} / {section} @ {threshold}: "
+                      f"missing={sorted(expected - actual)} extra={sorted(actual - expected)}")
+
+        print(f"threshold {threshold}: {len(texts)} sections, "
+              f"partial_ratio {reference_time:.2f}s, FuzzyMatcher {indexed_time:.2f}s "
+              f"({reference_time / max(indexed_time, 1e-9):.1f}x)")
+
+    if failures:
+        print(f"[ERROR] {failures} section(s) differ from fuzzywuzzy.")
+        sys.exit(1)
+    print("✅ FuzzyMatcher matches fuzzywuzzy on every section.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Checks the vectorized corpus scorer against the per-document pipeline.
+
+Run from the repository root:
+
+    python benchmarks/check_scoring_parity.py --copies 1 10 100
+
+Every PDF in uploads/ is classified with `process_pdf`. Its section scores,
+totals and decision must equal, exactly, what `score_corpus` computes for the
+whole corpus from the same matched keywords. The matched keywords are then
+replicated `--copies` times, and the per-document scoring loop is timed
+against `score_corpus`. Exits non-zero on any difference.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+# Keep process_pdf's per-document log lines out of the report
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from main import CSV_PATH, process_pdf, warm_up
+from utils.extraction_cache import cached_extract_text_from_pdf
+from utils.keyword_table import get_keyword_table
+from utils.nlp_processor import match_sections
+from utils.scoring import SECTION_ORDER, decide, score_corpus, weighted_scores
+
+UPLOAD_FOLDER = "uploads"
+
+
+def score_one(matched_sections, matcher):
+    """The per-document path: classify_text's raw sums, then weighted_scores."""
+    section_scores = {}
+    for section, matched in matched_sections.items():
+        section_scores[section] = {
+            field: sum(score for _, score in matcher.ordered(field, matched)) for field in ("CS", "IT")
+        }
+    cs_scores = weighted_scores(section_scores, "CS")
+    it_scores = weighted_scores(section_scores, "IT")
+    cs_total, it_total = sum(cs_scores.values()), sum(it_scores.values())
+    return cs_scores, it_scores, cs_total, it_total, decide(cs_total, it_total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default=UPLOAD_FOLDER)
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    with redirect_stdout(io.StringIO()):
+        warm_up()
+        table = get_keyword_table(CSV_PATH)
+
+    names, documents, expected = [], [], []
+    for name in sorted(os.listdir(args.folder)):
+        if not name.endswith(".pdf"):
+            continue
+        with redirect_stdout(io.StringIO()):
+            result = process_pdf(name, upload_folder=args.folder, save_results=False)
+            sections = cached_extract_text_from_pdf(os.path.join(args.folder, name))
+        if result[0] is None:
+            continue
+        names.append(name)
+        documents.append(match_sections(sections, table.matcher, table.fuzzy_matcher))
+        expected.append(result[1:5])
+
+    scored = score_corpus(documents, table.matcher)
+    mismatches = 0
+    for i, name in enumerate(names):
+        cs_scores, it_scores, cs_total, it_total = expected[i]
+        actual = (
+            [float(value) for value in scored["cs_scores"][i]],
+            [float(value) for value in scored["it_scores"][i]],
+            float(scored["cs_total"][i]),
+            float(scored["it_total"][i]),
+            str(scored["decision"][i]),
+        )
+        wanted = (
+            [cs_scores[section] for section in SECTION_ORDER],
+            [it_scores[section] for section in SECTION_ORDER],
+            cs_total,
+            it_total,
+            decide(cs_total, it_total),
+        )
+        if actual != wanted:
+            mismatches += 1
+            print(f"[MISMATCH] {name}: {actual} != {wanted}")
+
+    print(f"{len(names)} documents checked against process_pdf\n")
+    print(f"{'documents':>10} {'per document (s)':>17} {'score_corpus (s)':>17} {'speedup':>8}")
+    for copies in args.copies:
+        corpus = documents * copies
+
+        start = time.perf_counter()
+        for matched_sections in corpus:
+            score_one(matched_sections, table.matcher)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        score_corpus(corpus, table.matcher)
+        vectorized = time.perf_counter() - start
+
+        print(f"{len(corpus):>10} {loop:>17.4f} {vectorized:>17.4f} {loop / vectorized:>7.1f}x")
+
+    if mismatches:
+        print(f"[ERROR] {mismatches} document(s) score differently from process_pdf")
+        sys.exit(1)
+    print("\n✅ score_corpus matches process_pdf on every document.")
+
+
+if __name__ == "__main__":
+    main()
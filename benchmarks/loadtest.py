@@ -0,0 +1,428 @@
+"""Load test: replays the uploads/ corpus against a locally started app.
+
+Run from the repository root:
+
+    python benchmarks/loadtest.py --concurrency 8 --duration 30 --save benchmarks/load_baseline.json
+    python benchmarks/loadtest.py --rate 10 --concurrency 32 --duration 30 --compare benchmarks/load_baseline.json
+
+The app is started with app/serve.py (gunicorn; `--workers`, `--threads`)
+on a free local port, with its own temporary results database and, unless
+`--cache` is given, with the extraction and classification caches disabled,
+so every request parses and classifies its PDF like a fresh submission. The
+PDFs are POSTed to the index route round-robin, as the upload form does.
+`--url` targets an already running instance instead (server memory is then
+only sampled if `--server-pid` is given).
+
+Two load models:
+
+* closed (default): `--concurrency` clients, each sending its next request
+  as soon as the previous one is answered,
+* open (`--rate N`): requests arrive as a Poisson process at N per second,
+  whatever the server's speed, with at most `--concurrency` in flight.
+  Latency is measured from each request's scheduled arrival, so time spent
+  waiting for a free client counts too.
+
+The report gives throughput, p50/p95/p99/max latency, the error rate (any
+non-2xx response or connection failure) and the server's memory over time
+(RSS and PSS summed over its process tree; PSS counts shared pages once).
+`--save` writes it as JSON; `--compare` checks it against a saved report.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+UPLOAD_FOLDER = "uploads"
+READY_TIMEOUT = 120
+
+# Environment for the started server when caches are off: an LRU of size 0
+# always misses, and a disk tier of 0 bytes keeps nothing
+NO_CACHE_ENV = {
+    "EXTRACTION_CACHE_MEMORY_ENTRIES": "0",
+    "EXTRACTION_CACHE_MAX_BYTES": "0",
+    "CLASSIFICATION_CACHE_MEMORY_ENTRIES": "0",
+    "CLASSIFICATION_CACHE_DIR": "",
+}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def multipart_body(path, selected_course):
+    """The index form's POST body for one PDF: (bytes, content type)."""
+    boundary = uuid.uuid4().hex
+    with open(path, "rb") as file:
+        data = file.read()
+    filename = os.path.basename(path).replace('"', "")
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"selected_course\"\r\n\r\n{selected_course}\r\n"
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode("utf-8") + data + f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url, process=None, timeout=READY_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(url + "/", timeout=5) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"server at {url} not ready after {timeout}s")
+
+
+def process_tree(pid):
+    """`pid` and all its descendants, from /proc."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as file:
+                # The command name may contain spaces; the fields after it do not
+                ppid = int(file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def tree_memory_mb(pid):
+    """(RSS, PSS) in MB summed over the process tree of `pid`."""
+    rss = pss = 0
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/smaps_rollup", "r") as file:
+                for line in file:
+                    if line.startswith("Rss:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+        except OSError:
+            continue
+    return rss / 1024, pss / 1024
+
+
+class MemorySampler(threading.Thread):
+    """Samples the server tree's memory every `interval` seconds."""
+
+    def __init__(self, pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._start = time.monotonic()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss, pss = tree_memory_mb(self.pid)
+            self.samples.append({"t": round(time.monotonic() - self._start, 2), "rss_mb": round(rss, 1),
+                                 "pss_mb": round(pss, 1)})
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def send(url, body, content_type, timeout):
+    """POSTs one upload; returns (HTTP status or None, error message or None)."""
+    request = urllib.request.Request(url + "/", data=body, headers={"Content-Type": content_type})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status, None
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code, None
+    except (urllib.error.URLError, OSError) as e:
+        return None, str(getattr(e, "reason", e))
+
+
+def run_load(url, bodies, concurrency, rate, duration, max_requests, timeout, seed):
+    """Sends requests until `duration` seconds pass or `max_requests` were
+    started; returns one record per request."""
+    records = []
+    lock = threading.Lock()
+    counter = iter(range(max_requests or sys.maxsize))
+    start = time.monotonic()
+    deadline = start + duration
+
+    def request(index, scheduled):
+        name, body, content_type = bodies[index % len(bodies)]
+        sent = time.monotonic()
+        status, error = send(url, body, content_type, timeout)
+        finished = time.monotonic()
+        with lock:
+            records.append({
+                "file": name,
+                "start": round(scheduled - start, 4),
+                "latency": finished - scheduled,
+                "service": finished - sent,
+                "status": status,
+                "error": error,
+            })
+
+    if rate is None:
+        def client():
+            while time.monotonic() < deadline:
+                with lock:
+                    index = next(counter, None)
+                if index is None:
+                    return
+                request(index, time.monotonic())
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        rng = random.Random(seed)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            scheduled = start
+            for index in counter:
+                scheduled += rng.expovariate(rate)
+                if scheduled >= deadline:
+                    break
+                time.sleep(max(0.0, scheduled - time.monotonic()))
+                pool.submit(request, index, scheduled)
+
+    return records, time.monotonic() - start
+
+
+def summarize(records, elapsed, samples):
+    ok = [record for record in records if record["status"] is not None and 200 <= record["status"] < 300]
+    statuses = {}
+    for record in records:
+        key = str(record["status"]) if record["status"] is not None else "connection_error"
+        statuses[key] = statuses.get(key, 0) + 1
+
+    summary = {
+        "requests": len(records),
+        "ok": len(ok),
+        "error_rate": (len(records) - len(ok)) / len(records) if records else None,
+        "statuses": statuses,
+        "elapsed": elapsed,
+        "throughput": len(ok) / elapsed if elapsed else None,
+    }
+    if ok:
+        latencies = [record["latency"] for record in ok]
+        summary.update({
+            "p50": statistics.median(latencies),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies),
+            "service_p50": statistics.median(record["service"] for record in ok),
+        })
+    if samples:
+        summary.update({
+            "peak_rss_mb": max(sample["rss_mb"] for sample in samples),
+            "peak_pss_mb": max(sample["pss_mb"] for sample in samples),
+            "final_pss_mb": samples[-1]["pss_mb"],
+        })
+    return summary
+
+
+def print_summary(summary):
+    print(f"\n{'requests':>10} {'ok':>6} {'errors':>7} {'req/sec':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} "
+          f"{'p99 (ms)':>10} {'max (ms)':>10}")
+    errors = f"{summary['error_rate'] * 100:.1f}%" if summary["error_rate"] is not None else "-"
+    latency = " ".join(
+        f"{summary[key] * 1000:>10.1f}" if key in summary else f"{'-':>10}" for key in ("p50", "p95", "p99", "max")
+    )
+    print(f"{summary['requests']:>10} {summary['ok']:>6} {errors:>7} {summary['throughput'] or 0:>8.2f} {latency}")
+    print(f"Statuses: {summary['statuses']}")
+    if "peak_pss_mb" in summary:
+        print(f"Server memory: peak RSS {summary['peak_rss_mb']:.1f} MB, peak PSS {summary['peak_pss_mb']:.1f} MB, "
+              f"final PSS {summary['final_pss_mb']:.1f} MB")
+
+
+def compare(summary, baseline, tolerance):
+    """Lists the metrics that got worse than the baseline allows."""
+    regressions = []
+    for key in ("p50", "p95", "p99"):
+        before, after = baseline.get(key), summary.get(key)
+        if before and after and after > before * (1 + tolerance):
+            regressions.append(f"{key}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms "
+                               f"(+{(after / before - 1) * 100:.0f}%)")
+    before, after = baseline.get("throughput"), summary.get("throughput")
+    if before and after is not None and after < before * (1 - tolerance):
+        regressions.append(f"throughput: {before:.2f} -> {after:.2f} req/sec ({(after / before - 1) * 100:.0f}%)")
+    before, after = baseline.get("error_rate") or 0, summary.get("error_rate") or 0
+    if after > before + 0.01:
+        regressions.append(f"error rate: {before * 100:.1f}% -> {after * 100:.1f}%")
+    before, after = baseline.get("peak_pss_mb"), summary.get("peak_pss_mb")
+    if before and after and after > before * (1 + tolerance):
+        regressions.append(f"peak PSS: {before:.1f} MB -> {after:.1f} MB (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default=UPLOAD_FOLDER)
+    parser.add_argument("--concurrency", type=int, default=8, help="Clients (closed) or requests in flight (open)")
+    parser.add_argument("--rate", type=float, default=None, help="Arrivals per second (open model)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to generate load for")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--timeout", type=float, default=300, help="Client timeout per request")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the open model's arrivals")
+    parser.add_argument("--workers", type=int, default=2, help="Server worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="Server threads per worker")
+    parser.add_argument("--cache", action="store_true", help="Keep the server's extraction/classification caches")
+    parser.add_argument("--url", help="Load an already running instance instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="With --url: sample this process tree's memory")
+    parser.add_argument("--save", help="Write the report as JSON to this path")
+    parser.add_argument("--compare", help="Baseline report to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression as a fraction (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    names = sorted(name for name in os.listdir(args.folder) if name.lower().endswith(".pdf"))
+    if not names:
+        print(f"[ERROR] No PDFs found in {args.folder}")
+        sys.exit(1)
+    bodies = [(name, *multipart_body(os.path.join(args.folder, name), random.Random(name).choice(["CS", "IT"])))
+              for name in names]
+
+    server = None
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    url, server_pid = args.url, args.server_pid
+    try:
+        if url is None:
+            port = free_port()
+            url = f"http://127.0.0.1:{port}"
+            env = dict(os.environ, RESULTS_DB_PATH=os.path.join(workdir, "results.db"),
+                       EXTRACTION_CACHE_DIR=os.path.join(workdir, "extraction"))
+            if not args.cache:
+                env.update(NO_CACHE_ENV)
+            log_path = os.path.join(workdir, "server.log")
+            with open(log_path, "w") as log:
+                server = subprocess.Popen(
+                    [sys.executable, os.path.join("app", "serve.py"), "--bind", f"127.0.0.1:{port}",
+                     "--workers", str(args.workers), "--threads", str(args.threads), "--max-requests", "0"],
+                    cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+                )
+            server_pid = server.pid
+            print(f"🔹 Starting the app ({args.workers} worker(s) x {args.threads} thread(s)) at {url} ...")
+            try:
+                wait_ready(url, server)
+            except RuntimeError as e:
+                with open(log_path, "r") as log:
+                    print(log.read()[-2000:])
+                print(f"[ERROR] {e}")
+                sys.exit(1)
+        else:
+            wait_ready(url)
+
+        sampler = MemorySampler(server_pid) if server_pid and os.path.exists("/proc") else None
+        if sampler is not None:
+            sampler.start()
+        model = f"open, {args.rate:g} req/sec" if args.rate else "closed"
+        print(f"🔹 Replaying {len(names)} PDF(s) for {args.duration:g}s ({model}, concurrency {args.concurrency}) ...")
+        records, elapsed = run_load(url, bodies, args.concurrency, args.rate, args.duration, args.requests,
+                                    args.timeout, args.seed)
+        samples = []
+        if sampler is not None:
+            sampler.stop()
+            samples = sampler.samples
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    summary = summarize(records, elapsed, samples)
+    print_summary(summary)
+    failures = [record for record in records if record["error"]]
+    for record in failures[:5]:
+        print(f"[ERROR] {record['file']}: {record['error']}")
+
+    report = {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "folder": args.folder,
+        "documents": len(names),
+        "options": {
+            "concurrency": args.concurrency, "rate": args.rate, "duration": args.duration,
+            "requests": args.requests, "workers": None if args.url else args.workers,
+            "threads": None if args.url else args.threads, "cache": args.cache, "url": args.url,
+        },
+        "summary": summary,
+        "memory": samples,
+        "requests": records,
+    }
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\n✅ Report saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        print(f"\nComparing with {args.compare} (commit {baseline.get('commit')}, {baseline.get('created')})")
+        if baseline.get("options") != report["options"]:
+            print(f"[WARNING] Baseline ran with {baseline.get('options')}; results may not be comparable.")
+        regressions = compare(summary, baseline.get("summary", {}), args.tolerance)
+        if regressions:
+            for regression in regressions:
+                print(f"[REGRESSION] {regression}")
+            sys.exit(1)
+        print("✅ No metric is worse than the baseline allows.")
+
+
+if __name__ == "__main__":
+    main()
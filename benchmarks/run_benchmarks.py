@@ -0,0 +1,308 @@
+"""Reproducible pipeline benchmark over the bundled uploads/ corpus.
+
+Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --repeat 3 --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --repeat 3 --compare benchmarks/baseline.json
+
+Every PDF in the folder is timed through each pipeline stage:
+
+* extract_text_from_pdf: PDF parsing, title layout and segmentation,
+* extract_text_sections: segmentation alone, on the document's full text,
+* classify_text: tokenization plus exact and fuzzy keyword matching,
+* process_pdf: the whole upload pipeline, with the extraction and
+  classification caches disabled so every call parses and scores the PDF.
+
+The table reports p50/p95/max latency per document, documents per second and
+the process's peak RSS. Each document's time is the best of `--repeat` runs.
+`--keywords` pads (or truncates) the keyword table to the given sizes, so you
+can see how matching cost scales with the table; with more than one size,
+each size runs in a fresh interpreter so its peak RSS is its own. `--save` writes the results
+as JSON. `--compare` checks them against a saved baseline and fails if a stage
+got slower than the tolerance allows.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+# Keep benchmark runs out of the app's own cache and results database
+os.environ.setdefault("RESULTS_DB_PATH", os.path.join(tempfile.gettempdir(), "bench_results.db"))
+# and keep process_pdf's per-document log lines out of the report
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import main
+from bench_keyword_matcher import grow_table, load_table
+from utils import classification_cache, extraction_cache
+from utils.cache import LRUCache, TieredCache
+from utils.keyword_table import get_keyword_table
+from utils.nlp_processor import classify_text
+from utils.pdf_analyzer import extract_text_from_pdf, extract_text_sections, iter_pdf_pages
+
+UPLOAD_FOLDER = "uploads"
+
+STAGES = ["extract_text_from_pdf", "extract_text_sections", "classify_text", "process_pdf"]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def write_table(table, path):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["keyword", "CS", "IT"])
+        for keyword, cs_score in table["CS"].items():
+            writer.writerow([keyword, cs_score, table["IT"].get(keyword, 0)])
+
+
+def sized_table(table, size):
+    """The bundled table padded with synthetic terms, or cut down, to `size` keywords."""
+    if size >= len(table["CS"]):
+        return grow_table(table, size)
+    kept = list(table["CS"])[:size]
+    return {field: {keyword: scores[keyword] for keyword in kept} for field, scores in table.items()}
+
+
+def best_of(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(folder, names, csv_path, repeat):
+    """Times every stage on every document; returns {stage: {name: seconds}}."""
+    main.CSV_PATH = csv_path
+    with redirect_stdout(io.StringIO()):
+        table = get_keyword_table(csv_path)
+
+    timings = {stage: {} for stage in STAGES}
+    for name in names:
+        path = os.path.join(folder, name)
+        with redirect_stdout(io.StringIO()):
+            full_text = "".join(iter_pdf_pages(path))
+            sections = extract_text_from_pdf(path, streaming=main.STREAMING_EXTRACTION, max_pages=main.MAX_PDF_PAGES)
+            if not sections:
+                print(f"[WARNING] Skipping {name}: no text could be extracted.", file=sys.stderr)
+                continue
+
+            timings["extract_text_from_pdf"][name] = best_of(
+                lambda: extract_text_from_pdf(path, streaming=main.STREAMING_EXTRACTION, max_pages=main.MAX_PDF_PAGES),
+                repeat,
+            )
+            timings["extract_text_sections"][name] = best_of(lambda: extract_text_sections(full_text), repeat)
+            timings["classify_text"][name] = best_of(
+                lambda: classify_text(sections, table.matcher, table.fuzzy_matcher), repeat
+            )
+            timings["process_pdf"][name] = best_of(
+                lambda: main.process_pdf(name, upload_folder=folder, save_results=False), repeat
+            )
+    return timings
+
+
+def summarize(timings):
+    summary = {}
+    for stage, per_document in timings.items():
+        values = list(per_document.values())
+        if not values:
+            continue
+        total = sum(values)
+        summary[stage] = {
+            "documents": len(values),
+            "p50": statistics.median(values),
+            "p95": percentile(values, 0.95),
+            "max": max(values),
+            "total": total,
+            "docs_per_sec": len(values) / total if total else None,
+        }
+    return summary
+
+
+def print_summary(keywords, summary, rss):
+    print(f"\nKeyword table: {keywords} keywords, peak RSS {rss:.1f} MB")
+    print(f"{'stage':<24} {'docs':>5} {'p50 (ms)':>10} {'p95 (ms)':>10} {'max (ms)':>10} {'docs/sec':>10}")
+    for stage, stats in summary.items():
+        print(f"{stage:<24} {stats['documents']:>5} {stats['p50'] * 1000:>10.2f} {stats['p95'] * 1000:>10.2f} "
+              f"{stats['max'] * 1000:>10.2f} {stats['docs_per_sec']:>10.1f}")
+
+
+def compare(report, baseline, tolerance, min_delta):
+    """Lists stages whose p50 or p95 got slower than the baseline allows."""
+    regressions = []
+    if baseline.get("documents") != report["documents"] or baseline.get("folder") != report["folder"]:
+        print(f"[WARNING] Baseline covers {baseline.get('documents')} PDFs in {baseline.get('folder')}, "
+              f"this run {report['documents']} in {report['folder']}; percentiles may not be comparable.")
+    previous = {run["keywords"]: run for run in baseline.get("runs", [])}
+    for current in report["runs"]:
+        base = previous.get(current["keywords"])
+        if base is None:
+            print(f"[WARNING] Baseline has no run with {current['keywords']} keywords; not compared.")
+            continue
+        for stage, stats in current["stages"].items():
+            base_stats = base["stages"].get(stage)
+            if base_stats is None:
+                continue
+            for metric in ("p50", "p95"):
+                before, after = base_stats[metric], stats[metric]
+                if after > before * (1 + tolerance) and after - before > min_delta:
+                    regressions.append(
+                        f"{stage} {metric} with {current['keywords']} keywords: "
+                        f"{before * 1000:.2f} ms -> {after * 1000:.2f} ms (+{(after / before - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def run_size(args, names, size, table_dir):
+    """Times every stage with a keyword table of `size` (0 = bundled) in this
+    process; returns its entry for the report's "runs"."""
+    csv_path = main.CSV_PATH
+    if size:
+        csv_path = os.path.join(table_dir, f"keywords_{size}.csv")
+        write_table(sized_table(load_table(main.CSV_PATH), size), csv_path)
+    with redirect_stdout(io.StringIO()):
+        keywords = len(get_keyword_table(csv_path))
+
+    start = time.perf_counter()
+    timings = run(args.folder, names, csv_path, args.repeat)
+    summary = summarize(timings)
+    rss = peak_rss_mb()
+    print_summary(keywords, summary, rss)
+    print(f"({time.perf_counter() - start:.1f}s wall time)")
+
+    return {
+        "keywords": size or 0,
+        "keyword_count": keywords,
+        "peak_rss_mb": round(rss, 1),
+        "stages": summary,
+        "per_document": timings,
+    }
+
+
+def run_size_in_subprocess(args, size):
+    """`run_size` in a fresh interpreter: ru_maxrss only ever grows, so sizes
+    run one after another in this process would each report the running
+    maximum of the ones before."""
+    fd, path = tempfile.mkstemp(prefix="bench_run_", suffix=".json")
+    os.close(fd)
+    command = [sys.executable, os.path.abspath(__file__), "--folder", args.folder, "--repeat", str(args.repeat),
+               "--keywords", str(size), "--run-output", path]
+    if args.limit is not None:
+        command += ["--limit", str(args.limit)]
+    try:
+        subprocess.run(command, check=True)
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    finally:
+        os.remove(path)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default=UPLOAD_FOLDER)
+    parser.add_argument("--limit", type=int, default=None, help="Only the first N PDFs (sorted by name)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per document and stage; the best is kept")
+    parser.add_argument("--keywords", type=int, nargs="+", default=[0],
+                        help="Keyword table sizes to run with (0 = the bundled table as is)")
+    parser.add_argument("--save", help="Write the results as JSON to this path")
+    parser.add_argument("--compare", help="Baseline JSON to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown as a fraction (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=0.002,
+                        help="Ignore slowdowns smaller than this many seconds per document")
+    parser.add_argument("--run-output", help=argparse.SUPPRESS)  # Set for the per-size subprocesses
+    args = parser.parse_args()
+
+    names = sorted(name for name in os.listdir(args.folder) if name.endswith(".pdf"))[:args.limit]
+    if not names:
+        print(f"[ERROR] No PDFs found in {args.folder}")
+        sys.exit(1)
+
+    in_process = len(args.keywords) == 1
+    if in_process:
+        # Load every lazily imported dependency before timing anything, and never
+        # serve process_pdf from the caches: an LRU of size 0 misses always.
+        with redirect_stdout(io.StringIO()):
+            main.warm_up()
+        extraction_cache._cache = TieredCache(LRUCache(0))
+        classification_cache._cache = TieredCache(LRUCache(0))
+
+    table_dir = tempfile.mkdtemp(prefix="bench_keywords_")
+    report = {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "folder": args.folder,
+        "documents": len(names),
+        "repeat": args.repeat,
+        "runs": [],
+    }
+
+    try:
+        for size in args.keywords:
+            if in_process:
+                report["runs"].append(run_size(args, names, size, table_dir))
+            else:
+                report["runs"].append(run_size_in_subprocess(args, size))
+    finally:
+        shutil.rmtree(table_dir, ignore_errors=True)
+
+    if args.run_output:
+        with open(args.run_output, "w", encoding="utf-8") as file:
+            json.dump(report["runs"][0], file)
+        return
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\n✅ Results saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        print(f"\nComparing with {args.compare} (commit {baseline.get('commit')}, {baseline.get('created')})")
+        regressions = compare(report, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            for regression in regressions:
+                print(f"[REGRESSION] {regression}")
+            sys.exit(1)
+        print("✅ No stage is slower than the baseline allows.")
+
+
+if __name__ == "__main__":
+    main_cli()